@@ -4,16 +4,40 @@ Compare cursor-agent help outputs between two versions.
 """
 
 import argparse
+import functools
+import os
 import subprocess
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 import re
 
 VERSIONS_DIR = Path.home() / ".local/share/cursor-agent/versions"
 
+# Option name within an option spec like "-p, --print" or "--api-key <key>"
+_OPTION_NAME_RE = re.compile(r'--([a-z-]+)')
 
+
+@dataclass
+class SectionDiff:
+    """Differences of one help section (options or commands)."""
+    __slots__ = ("added", "removed", "modified")
+    added: dict
+    removed: dict
+    modified: dict
+
+
+@dataclass
+class HelpChanges:
+    """Differences between two help outputs."""
+    __slots__ = ("options", "commands")
+    options: SectionDiff
+    commands: SectionDiff
+
+
+@functools.lru_cache(maxsize=64)
 def get_help_output(version: str) -> str:
-    """Get help output for a specific version."""
+    """Get help output for a specific version (cached per version)."""
     cursor_agent_path = VERSIONS_DIR / version / "cursor-agent"
     
     if not cursor_agent_path.exists():
@@ -33,37 +57,64 @@ def get_help_output(version: str) -> str:
         raise RuntimeError(f"Failed to run help for {version}: {e}")
 
 
+@functools.lru_cache(maxsize=64)
 def parse_help_output(help_text: str) -> dict:
-    """Parse help output into structured data."""
+    """Parse help output into structured data (cached; treat the result as read-only).
+
+    Single pass over the lines: entries start at the section's entry indentation,
+    deeper-indented lines continue the previous entry's description.
+    """
     data = {
         "options": {},
         "commands": {}
     }
     
-    # Extract options section
-    options_match = re.search(r'Options:(.*?)(?=Commands:|$)', help_text, re.DOTALL)
-    if options_match:
-        options_text = options_match.group(1)
-        # Match option lines like: -p, --print  Description (default: false)
-        for match in re.finditer(r'^\s+(-[a-zA-Z],\s+)?--([a-z-]+)(?:\s+<[^>]+>)?\s+(.*?)(?=\n\s+(?:-|$)|\Z)', options_text, re.MULTILINE | re.DOTALL):
-            option_name = match.group(2)
-            description = match.group(3).strip().replace('\n', ' ')
-            data["options"][option_name] = description
-    
-    # Extract commands section
-    commands_match = re.search(r'Commands:(.*?)$', help_text, re.DOTALL)
-    if commands_match:
-        commands_text = commands_match.group(1)
-        # Match command lines like: install-shell-integration  Description
-        for match in re.finditer(r'^\s+([a-z-]+(?:\|[a-z-]+)?)\s+(.+?)(?=\n\s+[a-z]|\Z)', commands_text, re.MULTILINE | re.DOTALL):
-            command_name = match.group(1)
-            description = match.group(2).strip().replace('\n', ' ')
-            data["commands"][command_name] = description
+    section = None
+    entry_indent = None
+    current = None
+    for line in help_text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        
+        if stripped.startswith("Options:"):
+            section, entry_indent, current = "options", None, None
+            continue
+        if stripped.startswith("Commands:"):
+            section, entry_indent, current = "commands", None, None
+            continue
+        
+        indent = len(line) - len(line.lstrip())
+        if section is None or indent == 0:
+            # Any other unindented line ends the current section
+            section = current = None
+            continue
+        if entry_indent is None:
+            entry_indent = indent
+        
+        if indent > entry_indent:
+            # Wrapped description line
+            if current is not None:
+                data[section][current] = f"{data[section][current]} {stripped}"
+            continue
+        
+        # Entry lines look like: "-p, --print  Description" / "install-shell-integration  Description"
+        spec, _, description = stripped.partition("  ")
+        if section == "options":
+            name_match = _OPTION_NAME_RE.search(spec)
+            current = name_match.group(1) if name_match else None
+        else:
+            current, _, arg = spec.partition(" ")
+            if arg:
+                # e.g. "help [command]  display help": keep the argument with the description
+                description = f"{arg}  {description.strip()}"
+        if current is not None:
+            data[section][current] = description.strip()
     
     return data
 
 
-def compare_sections(older: dict, newer: dict, section: str) -> dict:
+def compare_sections(older: dict, newer: dict, section: str) -> SectionDiff:
     """Compare a specific section between two versions."""
     older_items = set(older[section].keys())
     newer_items = set(newer[section].keys())
@@ -80,68 +131,65 @@ def compare_sections(older: dict, newer: dict, section: str) -> dict:
                 "new": newer[section][item]
             }
     
-    return {
-        "added": {k: newer[section][k] for k in sorted(added)},
-        "removed": {k: older[section][k] for k in sorted(removed)},
-        "modified": modified
-    }
+    return SectionDiff(
+        added={k: newer[section][k] for k in sorted(added)},
+        removed={k: older[section][k] for k in sorted(removed)},
+        modified=modified
+    )
 
 
-def format_output(older_version: str, newer_version: str, changes: dict) -> str:
+def format_output(older_version: str, newer_version: str, changes: HelpChanges) -> str:
     """Format comparison results."""
-    output = []
-    output.append("## cursor-agent 版本比較\n")
-    output.append(f"**舊版本**: {older_version}")
-    output.append(f"**新版本**: {newer_version}\n")
+    output = [
+        "## cursor-agent 版本比較\n",
+        f"**舊版本**: {older_version}",
+        f"**新版本**: {newer_version}\n",
+    ]
     
     has_changes = False
     
-    # Options
-    if changes["options"]["added"]:
+    # Options (each section is joined once instead of appended line by line)
+    if changes.options.added:
         has_changes = True
         output.append("### 新增選項 (Added Options)\n")
-        for opt, desc in changes["options"]["added"].items():
-            output.append(f"- `--{opt}`: {desc}")
+        output.append("\n".join(f"- `--{opt}`: {desc}" for opt, desc in changes.options.added.items()))
         output.append("")
     
-    if changes["options"]["removed"]:
+    if changes.options.removed:
         has_changes = True
         output.append("### 移除選項 (Removed Options)\n")
-        for opt, desc in changes["options"]["removed"].items():
-            output.append(f"- `--{opt}`: {desc}")
+        output.append("\n".join(f"- `--{opt}`: {desc}" for opt, desc in changes.options.removed.items()))
         output.append("")
     
-    if changes["options"]["modified"]:
+    if changes.options.modified:
         has_changes = True
         output.append("### 修改選項 (Modified Options)\n")
-        for opt, descs in changes["options"]["modified"].items():
-            output.append(f"- `--{opt}`:")
-            output.append(f"  - 舊: {descs['old']}")
-            output.append(f"  - 新: {descs['new']}")
+        output.append("\n".join(
+            f"- `--{opt}`:\n  - 舊: {descs['old']}\n  - 新: {descs['new']}"
+            for opt, descs in changes.options.modified.items()
+        ))
         output.append("")
     
     # Commands
-    if changes["commands"]["added"]:
+    if changes.commands.added:
         has_changes = True
         output.append("### 新增命令 (Added Commands)\n")
-        for cmd, desc in changes["commands"]["added"].items():
-            output.append(f"- `{cmd}`: {desc}")
+        output.append("\n".join(f"- `{cmd}`: {desc}" for cmd, desc in changes.commands.added.items()))
         output.append("")
     
-    if changes["commands"]["removed"]:
+    if changes.commands.removed:
         has_changes = True
         output.append("### 移除命令 (Removed Commands)\n")
-        for cmd, desc in changes["commands"]["removed"].items():
-            output.append(f"- `{cmd}`: {desc}")
+        output.append("\n".join(f"- `{cmd}`: {desc}" for cmd, desc in changes.commands.removed.items()))
         output.append("")
     
-    if changes["commands"]["modified"]:
+    if changes.commands.modified:
         has_changes = True
         output.append("### 修改命令 (Modified Commands)\n")
-        for cmd, descs in changes["commands"]["modified"].items():
-            output.append(f"- `{cmd}`:")
-            output.append(f"  - 舊: {descs['old']}")
-            output.append(f"  - 新: {descs['new']}")
+        output.append("\n".join(
+            f"- `{cmd}`:\n  - 舊: {descs['old']}\n  - 新: {descs['new']}"
+            for cmd, descs in changes.commands.modified.items()
+        ))
         output.append("")
     
     if not has_changes:
@@ -167,10 +215,10 @@ def main():
         newer_data = parse_help_output(newer_help)
         
         # Compare
-        changes = {
-            "options": compare_sections(older_data, newer_data, "options"),
-            "commands": compare_sections(older_data, newer_data, "commands")
-        }
+        changes = HelpChanges(
+            options=compare_sections(older_data, newer_data, "options"),
+            commands=compare_sections(older_data, newer_data, "commands")
+        )
         
         # Format and print
         result = format_output(args.older, args.newer, changes)
@@ -180,9 +228,11 @@ def main():
         print(f"錯誤: {e}", file=sys.stderr)
         print(f"\n可用版本:", file=sys.stderr)
         if VERSIONS_DIR.exists():
-            for version in sorted(VERSIONS_DIR.iterdir(), reverse=True):
-                if version.is_dir():
-                    print(f"  - {version.name}", file=sys.stderr)
+            # scandir exposes is_dir() from the directory entry, no per-entry stat
+            with os.scandir(VERSIONS_DIR) as entries:
+                versions = sorted((e.name for e in entries if e.is_dir()), reverse=True)
+            for version in versions:
+                print(f"  - {version}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"錯誤: {e}", file=sys.stderr)
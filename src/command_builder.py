@@ -1,9 +1,15 @@
 """
 Command builder for constructing CLI commands.
 """
-from typing import List, Optional
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
 
 from loguru import logger
+from src.config import CURSOR_BIN
 from src.models import Message
 from src.slash_command_loader import SlashCommandLoader
 from src.temp_file_handler import (
@@ -13,15 +19,73 @@ from src.temp_file_handler import (
     CONTENT_SIZE_THRESHOLD,
 )
 
+# Constant cursor-agent flags shared by every chat command
+_BASE_FLAGS = (
+    "--approve-mcps",
+    "--force",  # "approve-mcps" has a bug. We still need the "force" option to run the MCP tools.
+    "--print",
+)
+_STREAM_OUTPUT_FLAGS = ("--output-format", "stream-json", "--stream-partial-output")
+_JSON_OUTPUT_FLAGS = ("--output-format", "json")
+
+# Most recently used workspaces whose slash command loaders are kept; every session has its own workspace
+SLASH_LOADER_CACHE_SIZE = 32
+
+# Prompt prefixes for each message role
+_ROLE_PREFIXES = {"system": "SYSTEM: ", "user": "USER: ", "assistant": "ASSISTANT: "}
+
 
 class CommandBuilder:
+    # Built per request; slots avoid a per-instance __dict__
+    __slots__ = ("model", "api_key", "messages", "session_id", "workspace_dir", "_slash_loader")
+
+    # SlashCommandLoader per (workspace, home), with the scan signature it was built from, in LRU order
+    _slash_loader_cache: "OrderedDict[Tuple[str, str], Tuple[tuple, SlashCommandLoader]]" = OrderedDict()
+    _slash_loader_lock = threading.Lock()
+
     def __init__(self, model: str, api_key: str, messages: List[Message], session_id: Optional[str] = None, workspace_dir: Optional[str] = None):
         self.model = model
         self.api_key = api_key
         self.messages = messages
         self.session_id = session_id
         self.workspace_dir = workspace_dir
-        self.slash_loader = SlashCommandLoader(workspace_dir)
+        self._slash_loader: Optional[SlashCommandLoader] = None
+
+    @property
+    def slash_loader(self) -> SlashCommandLoader:
+        """
+        The workspace's SlashCommandLoader, looked up on first use so the directory scan
+        runs inside build (in the executor thread when called via async_build).
+        """
+        if self._slash_loader is None:
+            self._slash_loader = self._get_slash_loader(self.workspace_dir)
+        return self._slash_loader
+
+    @classmethod
+    def _get_slash_loader(cls, workspace_dir: Optional[str]) -> SlashCommandLoader:
+        """
+        Return a cached SlashCommandLoader for the workspace, rebuilding it when
+        any of the scanned command/skill/agent directories or files has changed.
+        """
+        key = (workspace_dir or os.getcwd(), str(Path.home()))
+        signature = SlashCommandLoader.scan_signature(workspace_dir)
+        with cls._slash_loader_lock:
+            cached = cls._slash_loader_cache.get(key)
+            if cached is not None and cached[0] == signature:
+                cls._slash_loader_cache.move_to_end(key)
+                return cached[1]
+            loader = SlashCommandLoader(workspace_dir)
+            cls._slash_loader_cache[key] = (signature, loader)
+            cls._slash_loader_cache.move_to_end(key)
+            while len(cls._slash_loader_cache) > SLASH_LOADER_CACHE_SIZE:
+                cls._slash_loader_cache.popitem(last=False)
+            return loader
+
+    @classmethod
+    def clear_slash_loader_cache(cls):
+        """Drop all cached slash command loaders."""
+        with cls._slash_loader_lock:
+            cls._slash_loader_cache.clear()
 
     def _process_content_part(self, text: str) -> str:
         """
@@ -60,53 +124,41 @@ class CommandBuilder:
             return f"[Image URL: {image_url}]"
         return "[Image - unsupported format]"
 
-    def _get_processed_content(self, msg: Message) -> str:
+    def _get_processed_content(self, msg: Message, process_files: bool = True) -> str:
         """
-        Get message content, processing large content parts into @filepath references.
+        Get message content as text in a single pass over its parts.
+        With process_files, large content parts and images become @filepath references;
+        otherwise only the raw text parts are returned.
         """
+        # Parts at or under the threshold pass through as-is, so the length check is inlined
         if isinstance(msg.content, str):
-            return self._process_content_part(msg.content)
+            if process_files and len(msg.content) > CONTENT_SIZE_THRESHOLD:
+                return self._process_content_part(msg.content)
+            return msg.content
         
         # Handle list content (multimodal)
         texts = []
         for part in msg.content:
-            if hasattr(part, 'type'):
-                part_type = part.type
-                if part_type == "text":
-                    text = part.text if hasattr(part, 'text') else ""
-                    texts.append(self._process_content_part(text))
-                elif part_type == "image_url":
+            is_dict = isinstance(part, dict)
+            part_type = part.get("type") if is_dict else getattr(part, "type", None)
+            if part_type == "text":
+                text = part.get("text", "") if is_dict else getattr(part, "text", "")
+                texts.append(self._process_content_part(text) if process_files and len(text) > CONTENT_SIZE_THRESHOLD else text)
+            elif part_type == "image_url" and process_files:
+                if is_dict:
+                    image_url_data = part.get("image_url", {})
+                    url = image_url_data.get("url", "") if isinstance(image_url_data, dict) else ""
+                    texts.append(self._process_image_part(url))
+                else:
                     # Get the URL from image_url object
-                    image_url_obj = part.image_url if hasattr(part, 'image_url') else None
+                    image_url_obj = getattr(part, "image_url", None)
                     if image_url_obj:
-                        url = image_url_obj.url if hasattr(image_url_obj, 'url') else ""
-                        texts.append(self._process_image_part(url))
+                        texts.append(self._process_image_part(getattr(image_url_obj, "url", "")))
                     else:
                         texts.append("[Image - missing URL]")
-            elif isinstance(part, dict):
-                part_type = part.get("type")
-                if part_type == "text":
-                    text = part.get("text", "")
-                    texts.append(self._process_content_part(text))
-                elif part_type == "image_url":
-                    image_url_data = part.get("image_url", {})
-                    url = image_url_data.get("url", "") if isinstance(image_url_data, dict) else ""
-                    texts.append(self._process_image_part(url))
         
         return "\n".join(texts)
 
-    def _get_raw_content(self, msg: Message) -> str:
-        """Get message content as plain text without temp file processing."""
-        if isinstance(msg.content, str):
-            return msg.content
-        texts = []
-        for part in msg.content:
-            if hasattr(part, 'type') and part.type == "text":
-                texts.append(part.text if hasattr(part, 'text') else "")
-            elif isinstance(part, dict) and part.get("type") == "text":
-                texts.append(part.get("text", ""))
-        return "\n".join(texts)
-
     def _merge_messages(self) -> str:
         """Merge all conversation content into a single Prompt and expand slash commands"""
         merged = []
@@ -114,11 +166,9 @@ class CommandBuilder:
         for idx, msg in enumerate(self.messages):
             # Only apply temp-file processing to user messages (file uploads).
             # System/assistant messages are instructions or context that must stay inline.
-            if msg.role == "user":
-                content = self._get_processed_content(msg).strip()
-            else:
-                content = self._get_raw_content(msg).strip()
-            logger.debug(f"Message [{idx}] role={msg.role}, content_length={len(content)}, preview={content[:100]}")
+            content = self._get_processed_content(msg, process_files=msg.role == "user").strip()
+            # Positional args defer formatting until DEBUG is actually enabled
+            logger.debug("Message [{}] role={}, content_length={}, preview={:.100}", idx, msg.role, len(content), content)
             
             # Only try to expand slash commands for user messages
             if msg.role == "user":
@@ -128,37 +178,32 @@ class CommandBuilder:
                 content = resolved
             
             if has_assistant:
-                content = f"{msg.role.upper()}: {content}"
+                prefix = _ROLE_PREFIXES.get(msg.role) or f"{msg.role.upper()}: "
+                content = prefix + content
 
             merged.append(content)
         
         result = "\n\n".join(merged)
-        logger.debug(f"Merged {len(self.messages)} messages into {len(result)} characters")
+        logger.debug("Merged {} messages into {} characters", len(self.messages), len(result))
         return result
 
     def build(self, stream: bool = False) -> List[str]:
         prompt = self._merge_messages()
         
-        from src.config import CURSOR_BIN
+        # Single list literal so the final size is known up front
         cmd = [
             CURSOR_BIN,
             "--model", self.model,
             "--api-key", self.api_key,
-            "--approve-mcps",
-            "--force", # "approve-mcps" has a bug. We still need the "force" option to run the MCP tools.
-            "--print",
+            *_BASE_FLAGS,
+            *(("--resume", self.session_id) if self.session_id else ()),
+            *(("--workspace", self.workspace_dir) if self.workspace_dir else ()),
+            *(_STREAM_OUTPUT_FLAGS if stream else _JSON_OUTPUT_FLAGS),
+            prompt,
         ]
-        
-        if self.session_id:
-            cmd.extend(["--resume", self.session_id])
-        
-        if self.workspace_dir:
-            cmd.extend(["--workspace", self.workspace_dir])
-        
-        if stream:
-            cmd.extend(["--output-format", "stream-json", "--stream-partial-output"])
-        else:
-            cmd.extend(["--output-format", "json"])
-            
-        cmd.append(prompt)
         return cmd
+
+    async def async_build(self, stream: bool = False) -> List[str]:
+        """Run build in the default executor so the slash command scan and temp file writes don't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.build, stream)
@@ -1,7 +1,8 @@
+import functools
 import os
 import shutil
 import sys
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from loguru import logger
 
@@ -13,6 +14,13 @@ logger.add(sys.stdout, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
 CURSOR_BIN = "cursor-agent"
 CURSOR_CLI_PROXY_TMP = "/tmp/cursor-cli-proxy"
 
+@functools.lru_cache(maxsize=16)
+def _normalize_whitelist(entries: Tuple[str, ...]) -> Tuple[Tuple[str, str], ...]:
+    """(normalized path, normalized path + separator) per whitelist entry."""
+    normalized = (os.path.normpath(p) for p in entries)
+    return tuple((p, p + os.sep) for p in normalized)
+
+
 class Settings(BaseSettings):
     CURSOR_KEY: Optional[str] = None
     HOST: str = "0.0.0.0"
@@ -42,6 +50,10 @@ class Settings(BaseSettings):
             self.WORKSPACE_WHITELIST_5,
         ]
         return [p.strip() for p in entries if p and p.strip()]
+
+    def get_workspace_whitelist_normalized(self) -> Tuple[Tuple[str, str], ...]:
+        """Normalized whitelist entries with their subdirectory prefix, cached per whitelist."""
+        return _normalize_whitelist(tuple(self.get_workspace_whitelist()))
     
     def validate_cursor_bin(self):
         # Try to resolve CURSOR_BIN (if it is a command name)
@@ -54,5 +66,14 @@ class Settings(BaseSettings):
         logger.remove()
         logger.add(sys.stdout, format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}", level=self.LOG_LEVEL.upper())
 
-# 建立全域 config 物件
-config = Settings()
\ No newline at end of file
+@functools.lru_cache(maxsize=None)
+def get_config() -> Settings:
+    """Build the global Settings once (reads .env) and reuse it afterwards."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # 延遲建立全域 config 物件 (PEP 562)，import 本模組時不讀取 .env
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
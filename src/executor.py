@@ -3,15 +3,83 @@ Executor for running CLI commands.
 """
 import asyncio
 import json
+import re
 from typing import List, Optional
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; json.loads also accepts bytes
+    _json_loads = json.loads
+
 from loguru import logger
 from src.tool_formatters import format_tool_call_start, format_tool_call_result
 
+# Read size for non-stream stdout; large reads amortize syscalls and event-loop wakeups
+NON_STREAM_READ_SIZE = 64 * 1024
+
+# Only the end of stderr is kept for error reports; a failing CLI can print a lot
+STDERR_TAIL_BYTES = 64 * 1024
+
+# Bytes that affect JSON object nesting: braces, string quotes and escapes
+_JSON_STRUCTURE_RE = re.compile(rb'[{}"\\]')
+
+
+class StreamStats:
+    """Counters filled in by Executor.run_stream while a stream runs."""
+    __slots__ = ("events",)
+
+    def __init__(self):
+        # JSON events parsed from stdout; 0 means the CLI never produced a stream
+        self.events = 0
+
+
+class _JsonObjectTracker:
+    """Track brace depth across stdout chunks to detect when the top-level JSON object closes."""
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape_pending = False
+
+    def feed(self, chunk: bytes) -> bool:
+        """Scan a chunk; return True if the top-level object closed within it."""
+        pos = 0
+        if self.escape_pending:
+            # The previous chunk ended with a backslash inside a string
+            pos = 1
+            self.escape_pending = False
+        closed = False
+        while True:
+            match = _JSON_STRUCTURE_RE.search(chunk, pos)
+            if match is None:
+                return closed
+            pos = match.end()
+            char = chunk[match.start()]
+            if self.in_string:
+                if char == 0x5C:  # backslash: skip the escaped byte
+                    if pos >= len(chunk):
+                        self.escape_pending = True
+                        return closed
+                    pos += 1
+                elif char == 0x22:  # closing quote
+                    self.in_string = False
+            elif char == 0x22:
+                self.in_string = True
+            elif char == 0x7B:  # {
+                self.depth += 1
+            elif char == 0x7D and self.depth > 0:  # }
+                self.depth -= 1
+                if self.depth == 0:
+                    closed = True
+
 
 class Executor:
     """Responsible for executing CLI commands"""
 
+    # Stateless: all per-run state lives in the run_* coroutines
+    __slots__ = ()
+
     async def _terminate_process(self, process, sigterm_timeout: float = 3.0, sigkill_timeout: float = 5.0):
         """Gracefully terminate a subprocess: SIGTERM first, then SIGKILL as fallback."""
         if process.returncode is not None:
@@ -30,6 +98,25 @@ class Executor:
         except asyncio.TimeoutError:
             logger.error(f"Process {process.pid} could not be killed after SIGKILL, possible zombie")
 
+    async def _read_stderr_tail(self, process, timeout: float = 2.0) -> str:
+        """Drain stderr within the timeout, keeping only its last STDERR_TAIL_BYTES."""
+        tail = bytearray()
+
+        async def drain():
+            while True:
+                chunk = await process.stderr.read(STDERR_TAIL_BYTES)
+                if not chunk:
+                    return
+                tail.extend(chunk)
+                if len(tail) > STDERR_TAIL_BYTES:
+                    del tail[:-STDERR_TAIL_BYTES]
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return tail.decode(errors='replace')
+
     async def run_non_stream(self, cmd: List[str], cwd: Optional[str] = None, timeout: float = 300) -> str:
         """Execute command, monitor stdout, return immediately upon receiving valid JSON result"""
         process = await asyncio.create_subprocess_exec(
@@ -41,21 +128,26 @@ class Executor:
             limit=1024 * 1024 * 10,  # 10MB
         )
         
-        stdout_buffer = b""
+        # Grown in place, so parsing needs no joined copy of the output
+        buffer = bytearray()
+        tracker = _JsonObjectTracker()
         
         async def read_until_json():
-            nonlocal stdout_buffer
             # Read stdout chunk by chunk
             while True:
-                chunk = await process.stdout.read(4096)
+                chunk = await process.stdout.read(NON_STREAM_READ_SIZE)
                 if not chunk:
                     # stdout closed
                     break
-                stdout_buffer += chunk
+                buffer.extend(chunk)
+                
+                # The result is a single JSON object; only parse once it has closed
+                if not tracker.feed(chunk):
+                    continue
                 
                 # Try parsing JSON - if successful, output is complete
                 try:
-                    data = json.loads(stdout_buffer.decode())
+                    data = _json_loads(buffer)
                     # Successfully parsed JSON, can return immediately
                     logger.debug("Received valid JSON output, returning immediately")
                     return data.get("result", "")
@@ -63,7 +155,7 @@ class Executor:
                     # JSON is incomplete or UTF-8 characters are truncated, continue reading
                     continue
             # If no valid JSON received, return raw output
-            return stdout_buffer.decode(errors='replace').strip()
+            return buffer.decode(errors='replace').strip()
         
         try:
             result = await asyncio.wait_for(read_until_json(), timeout=timeout)
@@ -74,11 +166,11 @@ class Executor:
         finally:
             await self._terminate_process(process)
 
-    async def run_stream(self, cmd: List[str], cwd: Optional[str] = None):
-        """Execute command and stream stdout"""
-        logger.debug(f"Starting stream command: {cmd}")
+    async def run_stream(self, cmd: List[str], cwd: Optional[str] = None, stats: Optional[StreamStats] = None):
+        """Execute command and stream stdout; parsed events are counted in stats when given"""
+        logger.debug("Starting stream command: {}", cmd)
         if cwd:
-            logger.debug(f"Working directory: {cwd}")
+            logger.debug("Working directory: {}", cwd)
         process = await asyncio.create_subprocess_exec(
             *cmd,
             stdout=asyncio.subprocess.PIPE,
@@ -90,66 +182,84 @@ class Executor:
         
         line_count = 0
         tool_count = 0
-        call_id_to_tool_number = {}  # Track call_id -> tool_number mapping
-        last_full_text = ""
+        call_id_to_tool_number = {}  # Track call_id -> tool_number mapping for in-flight tool calls
+        # Text yielded since the last event type change; the final assistant message
+        # repeats all of it, so keep the parts and their total length to detect that
+        streamed_parts: List[str] = []
+        streamed_len = 0
         last_type = None
+        # Only separate event types when something was yielded since the last separator
+        needs_separator = False
         
         async for line in process.stdout:
-            line_str = line.decode().strip()
-            if not line_str:
+            # Skip blank/heartbeat lines without copying; JSON parsing tolerates the newline
+            if not line or line.isspace():
                 continue
             
             line_count += 1
             
             try:
-                data = json.loads(line_str)
-                logger.debug(f"[Stream Line {line_count}] Received JSON type: {data.get('type')}")
+                # Parse the raw bytes directly; only decode when falling back to plain text
+                data = _json_loads(line)
+                if stats is not None:
+                    stats.events += 1
+                # Debug messages pass values as arguments so nothing is formatted at INFO level
+                event_type = data.get("type")
+                logger.debug("[Stream Line {}] Received JSON type: {}", line_count, event_type)
                 
                 # Only process deltas of assistant type
-                event_type = data.get("type")
                 if event_type != last_type:
-                    logger.debug(f"[Stream Line {line_count}] Event type changed.")
-                    last_full_text = ""
-                    yield "\n"
+                    logger.debug("[Stream Line {}] Event type changed.", line_count)
+                    streamed_parts = []
+                    streamed_len = 0
+                    if needs_separator:
+                        yield "\n"
+                        needs_separator = False
                 if event_type == "assistant":
                     if "timestamp_ms" in data:
                         content_list = data.get("message", {}).get("content", [])
-                        logger.debug(f"[Stream Line {line_count}] Content list has {len(content_list)} items")
+                        logger.debug("[Stream Line {}] Content list has {} items", line_count, len(content_list))
                         
-                        # Accumulate all text content from this message
-                        full_text = ""
-                        for idx, item in enumerate(content_list):
-                            if item.get("type") == "text":
-                                text = item.get("text", "")
-                                full_text += text
-                                logger.debug(f"[Stream Line {line_count}] Item {idx}: text = {text}")
+                        # Accumulate all text content from this message; a single text item is the common case
+                        if len(content_list) == 1:
+                            item = content_list[0]
+                            full_text = item.get("text", "") if item.get("type") == "text" else ""
+                        else:
+                            full_text = "".join(item.get("text", "") for item in content_list if item.get("type") == "text")
+                        logger.debug("[Stream Line {}] text = {}", line_count, full_text)
                         
                         if not full_text:
                             continue
-                        if last_full_text != full_text:
-                            logger.debug(f"[Stream Line {line_count}] Content reset detected, yielding {full_text}")
+                        # Cheap length check first; only join when it could be the repeated full text
+                        if len(full_text) != streamed_len or full_text != "".join(streamed_parts):
+                            logger.debug("[Stream Line {}] Content reset detected, yielding {}", line_count, full_text)
                             yield full_text
-
-                        last_full_text += full_text
+                            needs_separator = True
+                            streamed_parts.append(full_text)
+                            streamed_len += len(full_text)
                     else:
                         # Received message without timestamp, treat as end, stop streaming
-                        logger.debug(f"[Stream Line {line_count}] Received assistant message without timestamp, ending stream")
+                        logger.debug("[Stream Line {}] Received assistant message without timestamp, ending stream", line_count)
 
                 elif event_type == "system":
                     subtype = data.get("subtype")
                     if subtype == "init":
                         model = data.get("model", "unknown")
-                        logger.debug(f"[Stream Line {line_count}] System init, model={model}")
+                        logger.debug("[Stream Line {}] System init, model={}", line_count, model)
                     else:
-                        logger.debug(f"[Stream Line {line_count}] System event subtype={subtype}")
+                        logger.debug("[Stream Line {}] System event subtype={}", line_count, subtype)
                 elif event_type == "thinking":
                     # Handle thinking messages - extract and stream thinking content
                     yield "."
+                    needs_separator = True
                 elif event_type == "tool_call":
                     subtype = data.get("subtype")
                     call_id = data.get("call_id")
                     tool_call = data.get("tool_call", {})
-                    logger.debug(f"[Stream Line {line_count}] Tool call event subtype={subtype}, call_id={call_id}, keys={list(tool_call.keys())}")
+                    logger.opt(lazy=True).debug(
+                        "[Stream Line {}] Tool call event subtype={}, call_id={}, keys={}",
+                        lambda: line_count, lambda: subtype, lambda: call_id, lambda: list(tool_call.keys()),
+                    )
                     
                     # Format and yield tool call information
                     if subtype == "started":
@@ -160,38 +270,39 @@ class Executor:
                         tool_info = format_tool_call_start(tool_call, tool_count)
                         if tool_info:
                             yield tool_info
+                            needs_separator = True
                     elif subtype == "completed":
-                        # Look up the tool_number for this call_id
-                        tool_number = call_id_to_tool_number.get(call_id) if call_id else None
+                        # Look up the tool_number for this call_id; the call is done, so drop the mapping
+                        tool_number = call_id_to_tool_number.pop(call_id, None) if call_id else None
                         tool_result = format_tool_call_result(tool_call, tool_number)
                         if tool_result:
                             yield tool_result
+                            needs_separator = True
                 elif event_type == "result":
                     duration_ms = data.get("duration_ms")
-                    logger.debug(f"[Stream Line {line_count}] Result event duration_ms={duration_ms}, ending stream")
+                    logger.debug("[Stream Line {}] Result event duration_ms={}, ending stream", line_count, duration_ms)
                     break
                 else:
-                    logger.debug(f"[Stream Line {line_count}] Skipping unknown message type={event_type}")
+                    logger.debug("[Stream Line {}] Skipping unknown message type={}", line_count, event_type)
 
                 last_type = event_type
 
-            except json.JSONDecodeError as e:
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
                 # If not JSON, might be old version output or error message
+                line_str = line.decode(errors='replace').strip()
                 logger.warning(f"[Stream Line {line_count}] Failed to decode JSON: {e}, line: {line_str[:100]}")
                 yield line_str
+                needs_separator = True
             
-        logger.debug(f"Stream finished after {line_count} lines")
+        logger.debug("Stream finished after {} lines", line_count)
         await self._terminate_process(process)
 
         if process.returncode is None:
             logger.warning(f"Process {process.pid} could not be terminated and may still be running")
             return
 
-        try:
-            stderr_data = await asyncio.wait_for(process.stderr.read(), timeout=2.0)
-        except asyncio.TimeoutError:
-            stderr_data = b""
-        
+        # stderr only matters on failure, so it is not read or decoded otherwise
         if process.returncode not in (0, -9, -15):
-            logger.error(f"Stream command failed with code {process.returncode}: {stderr_data.decode(errors='replace')}")
-            raise RuntimeError(f"CLI execution failed (code {process.returncode}): {stderr_data.decode(errors='replace')}")
+            stderr_text = await self._read_stderr_tail(process)
+            logger.error(f"Stream command failed with code {process.returncode}: {stderr_text}")
+            raise RuntimeError(f"CLI execution failed (code {process.returncode}): {stderr_text}")
@@ -1,18 +1,42 @@
 import sys
+import asyncio
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI, HTTPException, Header, Depends
-from fastapi.responses import StreamingResponse
-from src.models import ChatCompletionRequest, ChatCompletionResponse, Choice, Message, ChatCompletionChunk, ChunkChoice, ChunkDelta, ModelList, Model
-from src.relay import CommandBuilder, Executor, extract_workspace_from_messages
+from fastapi.responses import Response, StreamingResponse
+from src.models import ChatCompletionRequest, ChatCompletionResponse, Choice, Message, ChatCompletionChunk, ChunkChoice, ChunkDelta, Model
+from src.relay import CommandBuilder, Executor, StreamStats, extract_workspace_from_messages
 from src.slash_command_loader import SlashCommandLoader
 from src.config import config, logger
 from src.model_registry import model_registry, ModelRegistry
 from src.session_manager import SessionManager
+from src.stream_buffer import coalesce_chunks, with_keepalive
 import time
-import uuid
+import secrets
 import json
+from typing import Tuple
 
-app = FastAPI(title="Cursor CLI Proxy")
+try:
+    import orjson
+    _json_dumps_bytes = orjson.dumps
+except ImportError:  # orjson is optional
+    def _json_dumps_bytes(value) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the model list at startup so the first /v1/models request doesn't read models.json."""
+    model_registry.get_models()
+    yield
+
+app = FastAPI(title="Cursor CLI Proxy", lifespan=lifespan)
+
+# Pre-encoded SSE framing; stream frames are yielded as bytes
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_DONE = b"data: [DONE]\n\n"
+# Stop proxies (e.g. Nginx) from buffering the event stream
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 # Ensure config validation
 config.validate()
@@ -20,13 +44,16 @@ config.validate()
 # Initialize SessionManager
 session_manager = SessionManager()
 
+# Executor keeps no per-call state, so one instance serves every request
+executor = Executor()
+
 async def verify_auth(authorization: str = Header(None)) -> str:
     """Resolve API key: use CURSOR_KEY if set, otherwise require valid Bearer token."""
     if config.CURSOR_KEY:
         return config.CURSOR_KEY
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authentication header")
-    token = authorization.split(" ", 1)[1].strip()
+    token = authorization[7:].strip()
     if not token:
         raise HTTPException(status_code=401, detail="Missing API key in Bearer token")
     return token
@@ -37,13 +64,25 @@ def _build_think_block(builder: CommandBuilder, session_id: str) -> str:
     commands_str = "\n" + "\n".join(command_labels) if command_labels else "(none)"
     return f"<think>\nSession ID: {session_id}\nAvailable Commands: {commands_str}\n</think>\n\n"
 
+def _content_frame_template(req_id: str, created: int, model: str) -> Tuple[bytes, bytes]:
+    """Serialize a content chunk once and split it into SSE frame bytes around the content value."""
+    template = ChatCompletionChunk(
+        id=req_id,
+        created=created,
+        model=model,
+        choices=[ChunkChoice(index=0, delta=ChunkDelta(content=""))]
+    ).model_dump_json(exclude_none=True)
+    head, _, tail = template.rpartition('"content":""')
+    return _SSE_PREFIX + f'{head}"content":'.encode("utf-8"), tail.encode("utf-8") + _SSE_SUFFIX
+
 
-@app.get("/v1/models", response_model=ModelList)
+@app.get("/v1/models")
 async def list_models(api_key: str = Depends(verify_auth)):
     """Return dynamic model list"""
-    return ModelList(data=model_registry.get_models(api_key=api_key))
+    # The body is cached by the registry; the model list only changes on reload/refresh
+    return Response(content=model_registry.get_models_json(api_key=api_key), media_type="application/json")
 
-@app.post("/v1/chat/completions", response_model=ChatCompletionResponse)
+@app.post("/v1/chat/completions")
 async def chat_completions(
     request: ChatCompletionRequest,
     api_key: str = Depends(verify_auth)
@@ -58,8 +97,10 @@ async def chat_completions(
         history_messages = cleaned_messages[:-1]
         current_message = cleaned_messages[-1]
         
-        history_hash = session_manager.calculate_history_hash(history_messages)
-        session = session_manager.get_session_by_hash(history_hash)
+        # Keep the running hasher so the post-response hash only adds the new turn
+        history_hasher = session_manager.history_hasher(history_messages)
+        history_hash = history_hasher.hexdigest()
+        session = await session_manager.async_get_session_by_hash(history_hash)
         
         session_id = None
         workspace_dir = None
@@ -68,12 +109,12 @@ async def chat_completions(
         
         # If custom session_id is provided, use it directly (if it exists)
         if custom_session_id:
-            existing_session = session_manager.get_session_by_id(custom_session_id)
+            existing_session = await session_manager.async_get_session_by_id(custom_session_id)
             if existing_session:
                 session_id = custom_session_id
                 workspace_dir = existing_session.get("workspace_dir") or custom_workspace
                 is_session_hit = True
-                custom_session_hash = session_manager.get_hash_by_session_id(custom_session_id)
+                custom_session_hash = await session_manager.async_get_hash_by_session_id(custom_session_id)
                 logger.info(f"Using custom session_id from system prompt: {session_id}")
             else:
                 logger.warning(f"Custom session_id '{custom_session_id}' not found, falling back to normal flow")
@@ -83,16 +124,14 @@ async def chat_completions(
             session_id = session["session_id"]
             workspace_dir = session.get("workspace_dir")
             is_session_hit = True
-            logger.debug(f"Session Hit: Resuming session {session_id} for hash {history_hash[:8]}...")
+            logger.debug("Session Hit: Resuming session {} for hash {:.8}...", session_id, history_hash)
         elif session_id is None:
             title = current_message.get_text_content()[:50]
             # Pass custom_workspace when creating new session
-            session_id = session_manager.create_session(history_hash, title, custom_workspace=custom_workspace)
-            # Re-fetch session to get workspace_dir
-            new_session = session_manager.get_session_by_hash(history_hash)
-            if new_session:
-                workspace_dir = new_session.get("workspace_dir")
-            logger.debug(f"Session Miss: Created new session {session_id} for hash {history_hash[:8]}...")
+            new_session = await session_manager.async_create_session(history_hash, title, custom_workspace=custom_workspace)
+            session_id = new_session["session_id"]
+            workspace_dir = new_session.get("workspace_dir")
+            logger.debug("Session Miss: Created new session {} for hash {:.8}...", session_id, history_hash)
 
         # If it's a new session (or session miss), send full history; if resuming, only send the last message
         if is_session_hit:
@@ -100,11 +139,13 @@ async def chat_completions(
             logger.debug("Sending latest message only to existing session.")
         else:
             messages_to_send = cleaned_messages
-            logger.debug(f"Sending full history ({len(messages_to_send)} messages) to new session.")
+            logger.debug("Sending full history ({} messages) to new session.", len(messages_to_send))
 
         # Inject available skills metadata into system prompt for new sessions
         if config.ENABLE_SKILLS_IN_PROMPT and not is_session_hit:
-            skills_loader = SlashCommandLoader(workspace_dir)
+            # The directory scan runs in the default executor so it doesn't block the event loop
+            loop = asyncio.get_running_loop()
+            skills_loader = await loop.run_in_executor(None, SlashCommandLoader, workspace_dir)
             skills_xml = skills_loader.get_skills_metadata_xml()
             if skills_xml:
                 skills_message = Message(role="system", content=skills_xml)
@@ -119,51 +160,39 @@ async def chat_completions(
             session_id=session_id,
             workspace_dir=workspace_dir
         )
-        cmd = builder.build(stream=request.stream)
+        cmd = await builder.async_build(stream=request.stream)
         
-        executor = Executor()
         should_add_think = config.ENABLE_INFO_IN_THINK and not is_session_hit
         
         if request.stream:
             async def event_generator():
-                req_id = f"chatcmpl-{uuid.uuid4()}"
+                req_id = f"chatcmpl-{secrets.token_hex(16)}"
+                # Read once per response: every chunk shares the same created timestamp
                 created = int(time.time())
-                full_content = []
+                parts = []
+                has_content = False
+                stats = StreamStats()
+                # Content chunks only differ in their text, so only that is serialized per chunk
+                frame_head, frame_tail = _content_frame_template(req_id, created, request.model)
                 
                 logger.debug("Starting stream generation")
                 try:                    
-                    async for chunk in executor.run_stream(cmd, cwd=workspace_dir):
-                        full_content.append(chunk)
-                        chunk_data = ChatCompletionChunk(
-                            id=req_id,
-                            created=created,
-                            model=request.model,
-                            choices=[
-                                ChunkChoice(
-                                    index=0,
-                                    delta=ChunkDelta(content=chunk)
-                                )
-                            ]
-                        )
-                        yield f"data: {chunk_data.model_dump_json(exclude_none=True)}\n\n"
+                    # Coalesce small executor chunks into fewer, larger SSE frames
+                    async for chunk in coalesce_chunks(executor.run_stream(cmd, cwd=workspace_dir, stats=stats)):
+                        has_content = True
+                        parts.append(chunk)
+                        # Bytes frames go straight to the response without a str -> bytes encode
+                        yield frame_head + _json_dumps_bytes(chunk) + frame_tail
 
-                    if not full_content:
-                        logger.warning("Stream produced no output from executor")
-                        return
-
-                    if should_add_think:
-                        think_chunk = ChatCompletionChunk(
-                            id=req_id,
-                            created=created,
-                            model=request.model,
-                            choices=[
-                                ChunkChoice(
-                                    index=0,
-                                    delta=ChunkDelta(content=_build_think_block(builder, session_id))
-                                )
-                            ]
-                        )
-                        yield f"data: {think_chunk.model_dump_json(exclude_none=True)}\n\n"
+                    if not has_content:
+                        if not stats.events:
+                            logger.warning("Stream produced no output from executor")
+                            return
+                        # The CLI ran but replied without text: finish it as an empty reply
+                        logger.info("Stream completed with an empty reply")
+                    elif should_add_think:
+                        # The think block is an ordinary content chunk, so it reuses the frame template
+                        yield frame_head + _json_dumps_bytes(_build_think_block(builder, session_id)) + frame_tail
 
                     # Send final chunk with finish_reason="stop" before [DONE]
                     final_chunk = ChatCompletionChunk(
@@ -178,40 +207,44 @@ async def chat_completions(
                             )
                         ]
                     )
-                    yield f"data: {final_chunk.model_dump_json(exclude_none=True)}\n\n"
+                    yield _SSE_PREFIX + _json_dumps_bytes(final_chunk.model_dump(exclude_none=True)) + _SSE_SUFFIX
+                    
+                    # Update Session Hash (use original hash for custom session_id)
+                    # Finished before [DONE], so a client's next turn always finds the new hash;
+                    # the sessions.json write itself runs off the event loop
+                    new_hash = history_hasher.extend(
+                        [current_message, Message(role="assistant", content="".join(parts))]
+                    ).hexdigest()
+                    old_hash = custom_session_hash or history_hash
+                    await session_manager.async_update_session_hash(old_hash, new_hash)
+                    logger.debug("Updated session hash: {:.8}... -> {:.8}...", old_hash, new_hash)
                     
                     # End of stream
                     logger.debug("Stream finished successfully")
-                    yield "data: [DONE]\n\n"
-                    
-                    # Update Session Hash (skip if custom session_id is used)
-                    response_text = "".join(full_content)
-                    new_history = cleaned_messages + [Message(role="assistant", content=response_text)]
-                    new_hash = session_manager.calculate_history_hash(new_history)
-                    old_hash = custom_session_hash or history_hash
-                    session_manager.update_session_hash(old_hash, new_hash)
-                    logger.debug(f"Updated session hash: {old_hash[:8]}... -> {new_hash[:8]}...")
+                    yield _SSE_DONE
                     
                 except Exception as e:
                     logger.error(f"Stream error: {e}")
-                    error_json = json.dumps({"error": {"message": str(e), "type": "stream_error"}})
-                    yield f"data: {error_json}\n\n"
+                    error_json = _json_dumps_bytes({"error": {"message": str(e), "type": "stream_error"}})
+                    yield _SSE_PREFIX + error_json + _SSE_SUFFIX
 
-            return StreamingResponse(event_generator(), media_type="text/event-stream")
+            # Keep-alive comments stop proxies from timing out long silent stretches (e.g. tool runs)
+            return StreamingResponse(with_keepalive(event_generator()), media_type="text/event-stream", headers=_SSE_HEADERS)
         else:
             content = await executor.run_non_stream(cmd, cwd=workspace_dir)
             think_block = _build_think_block(builder, session_id) if (should_add_think and content) else ""
             content_with_think = (think_block or "") + content
             
             # Update Session Hash (use original hash for custom session_id)
-            new_history = cleaned_messages + [Message(role="assistant", content=content)]
-            new_hash = session_manager.calculate_history_hash(new_history)
+            new_hash = history_hasher.extend(
+                [current_message, Message(role="assistant", content=content)]
+            ).hexdigest()
             old_hash = custom_session_hash or history_hash
-            session_manager.update_session_hash(old_hash, new_hash)
-            logger.debug(f"Updated session hash: {old_hash[:8]}... -> {new_hash[:8]}...")
+            await session_manager.async_update_session_hash(old_hash, new_hash)
+            logger.debug("Updated session hash: {:.8}... -> {:.8}...", old_hash, new_hash)
             
             return ChatCompletionResponse(
-                id=f"chatcmpl-{uuid.uuid4()}",
+                id=f"chatcmpl-{secrets.token_hex(16)}",
                 created=int(time.time()),
                 model=request.model,
                 choices=[
@@ -227,7 +260,9 @@ async def chat_completions(
         logger.error(f"CLI Error: {e}")
         raise HTTPException(status_code=500, detail={"error": {"message": str(e), "type": "cli_error"}})
     except Exception as e:
-        logger.exception("Unexpected error")
+        logger.error(f"Unexpected error: {e}")
+        # The traceback is only formatted when a DEBUG sink is active
+        logger.opt(exception=e).debug("Unexpected error traceback")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
@@ -296,6 +331,7 @@ if __name__ == "__main__":
         "port": config.PORT,
         "log_level": config.LOG_LEVEL.lower(),
         "reload": args.reload,
+        # uvicorn's default "auto" loop/http already picks uvloop and httptools when they are installed
     }
     
     # Add SSL configuration if HTTPS is enabled
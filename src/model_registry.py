@@ -2,26 +2,40 @@ import subprocess
 import re
 import json
 import os
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from loguru import logger
-from src.models import Model
+from src.models import Model, ModelList
 from src.config import config
 
-CACHE_FILE = "models.json"
+try:
+    import orjson
 
-class ModelRegistry:
-    _instance = None
-    _models: Optional[List[Model]] = None
+    def _dump_json(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ModelRegistry, cls).__new__(cls)
-        return cls._instance
+    _load_json = orjson.loads
+except ImportError:  # orjson is optional
+    def _dump_json(data) -> bytes:
+        return json.dumps(data, indent=2).encode("utf-8")
 
+    _load_json = json.loads
+
+CACHE_FILE = "models.json"
+
+# "model-id - Model Name (optional)" lines of `cursor-agent models`
+_MODEL_LINE_RE = re.compile(r'^([a-zA-Z0-9._-]+)\s+-\s+(.+)$')
+# Trailing status tags like (default), (current), (current, default)
+_STATUS_TAG_RE = re.compile(r'\s+\([^)]*?\b(?:default|current)\b[^)]*?\)$')
+
+class ModelRegistry:
     _CLAUDE_PREFIXES = ("opus-", "sonnet-")
 
     def __init__(self):
-        pass
+        self._models: Optional[List[Model]] = None
+        # (source _models list, display-id models derived from it)
+        self._display_cache: Optional[Tuple[List[Model], List[Model]]] = None
+        # (models it was built from, serialized /v1/models response body)
+        self._json_cache: Optional[Tuple[List[Model], bytes]] = None
 
     @staticmethod
     def to_display_id(model_id: str) -> str:
@@ -50,8 +64,8 @@ class ModelRegistry:
         """Save models to JSON file."""
         try:
             data = [m.model_dump() for m in models]
-            with open(CACHE_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            with open(CACHE_FILE, "wb") as f:
+                f.write(_dump_json(data))
             logger.info(f"Saved {len(models)} models to {CACHE_FILE}")
         except Exception as e:
             logger.error(f"Failed to save models to file: {e}")
@@ -62,8 +76,8 @@ class ModelRegistry:
             return False
             
         try:
-            with open(CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(CACHE_FILE, "rb") as f:
+                data = _load_json(f.read())
             
             self._models = [Model(**item) for item in data]
             logger.debug(f"Loaded {len(self._models)} models from {CACHE_FILE}")
@@ -145,13 +159,13 @@ class ModelRegistry:
             
             if parsing:
                 # Parse line format: "model-id - Model Name (optional)"
-                match = re.match(r'^([a-zA-Z0-9._-]+)\s+-\s+(.+)$', line)
+                match = _MODEL_LINE_RE.match(line)
                 if match:
                     model_id = match.group(1)
                     model_name = match.group(2).strip()
                     # Remove trailing status tags like (default), (current), (current, default)
                     # but keep model name parts like (Thinking)
-                    model_name = re.sub(r'\s+\([^)]*?\b(?:default|current)\b[^)]*?\)$', '', model_name).strip()
+                    model_name = _STATUS_TAG_RE.sub('', model_name).strip()
                     models.append(Model(id=model_id, owned_by="cursor", name=model_name))
                 else:
                     logger.debug(f"Skipping unparseable line: {line}")
@@ -192,7 +206,24 @@ class ModelRegistry:
                 # So we stick to defaults if no file.
                 self._models = self.default_models
                 
-        return [m.model_copy(update={"id": self.to_display_id(m.id)}) for m in self._models]
+        # Rebuilt only when _models has been replaced (load, refresh, initialize, reset)
+        cached = self._display_cache
+        if cached is None or cached[0] is not self._models:
+            display = []
+            for m in self._models:
+                display_id = self.to_display_id(m.id)
+                # Models whose id needs no prefix are shared as-is instead of copied
+                display.append(m.model_copy(update={"id": display_id}) if display_id != m.id else m)
+            cached = self._display_cache = (self._models, display)
+        return list(cached[1])
+
+    def get_models_json(self, api_key: Optional[str] = None) -> bytes:
+        """Serialized ModelList of get_models(), reused while the same model objects are returned."""
+        models = self.get_models(api_key=api_key)
+        cached = self._json_cache
+        if cached is None or len(cached[0]) != len(models) or any(a is not b for a, b in zip(cached[0], models)):
+            cached = self._json_cache = (models, ModelList(data=models).model_dump_json().encode("utf-8"))
+        return cached[1]
 
     def refresh(self, api_key: Optional[str] = None) -> List[Model]:
         """Force refresh the model list."""
@@ -202,6 +233,8 @@ class ModelRegistry:
     def reset(self):
         """Reset the registry state (FOR TESTING ONLY)."""
         self._models = None
+        self._display_cache = None
+        self._json_cache = None
 
-# Global instance
+# Global instance shared by the app; use this rather than constructing new registries
 model_registry = ModelRegistry()
@@ -1,5 +1,5 @@
 import time
-import uuid
+import secrets
 from typing import List, Optional, Literal, Union, Any
 from pydantic import BaseModel, Field, field_validator
 
@@ -19,6 +19,16 @@ class ImageContentPart(BaseModel):
 # Union of all content part types
 ContentPart = Union[TextContentPart, ImageContentPart]
 
+# Text that Message.get_text_content extracts per part, keyed by model type or dict "type"
+_PART_TEXT = {
+    TextContentPart: lambda part: part.text,
+    ImageContentPart: lambda part: "[Image]",
+}
+_DICT_PART_TEXT = {
+    "text": lambda part: part.get("text", ""),
+    "image_url": lambda part: "[Image]",
+}
+
 class Message(BaseModel):
     role: Literal["system", "user", "assistant"]
     content: Union[str, List[ContentPart]]
@@ -30,11 +40,11 @@ class Message(BaseModel):
         # Extract text from content parts
         texts = []
         for part in self.content:
-            if isinstance(part, TextContentPart) or (isinstance(part, dict) and part.get("type") == "text"):
-                text = part.text if isinstance(part, TextContentPart) else part.get("text", "")
-                texts.append(text)
-            elif isinstance(part, ImageContentPart) or (isinstance(part, dict) and part.get("type") == "image_url"):
-                texts.append("[Image]")
+            handler = _PART_TEXT.get(type(part))
+            if handler is None and isinstance(part, dict):
+                handler = _DICT_PART_TEXT.get(part.get("type"))
+            if handler is not None:
+                texts.append(handler(part))
         return "\n".join(texts)
 
 class ChatCompletionRequest(BaseModel):
@@ -55,7 +65,7 @@ class Choice(BaseModel):
     finish_reason: Optional[str] = "stop"
 
 class ChatCompletionResponse(BaseModel):
-    id: str = Field(default_factory=lambda: f"chatcmpl-{uuid.uuid4()}")
+    id: str = Field(default_factory=lambda: f"chatcmpl-{secrets.token_hex(16)}")
     object: str = "chat.completion"
     created: int = Field(default_factory=lambda: int(time.time()))
     model: str
@@ -71,7 +81,7 @@ class ChunkChoice(BaseModel):
     finish_reason: Optional[str] = None
 
 class ChatCompletionChunk(BaseModel):
-    id: str = Field(default_factory=lambda: f"chatcmpl-{uuid.uuid4()}")
+    id: str = Field(default_factory=lambda: f"chatcmpl-{secrets.token_hex(16)}")
     object: str = "chat.completion.chunk"
     created: int = Field(default_factory=lambda: int(time.time()))
     model: str
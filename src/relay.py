@@ -20,7 +20,7 @@ from src.tag_parser import (
     extract_workspace_from_messages,
 )
 from src.command_builder import CommandBuilder
-from src.executor import Executor
+from src.executor import Executor, StreamStats
 
 # Re-export for backward compatibility
 from src.slash_command_loader import SlashCommandLoader
@@ -40,6 +40,7 @@ __all__ = [
     "CommandBuilder",
     # executor
     "Executor",
+    "StreamStats",
     # slash_command_loader (re-export)
     "SlashCommandLoader",
 ]
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 import json
 import hashlib
 import uuid
@@ -6,7 +8,8 @@ import re
 import signal
 import subprocess
 import threading
-from typing import List, Dict, Optional, Any
+from collections import OrderedDict
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timezone
 from filelock import FileLock, Timeout
 from loguru import logger
@@ -15,6 +18,118 @@ from src.models import Message
 
 CREATE_CHAT_READLINE_TIMEOUT = 30
 
+_THINK_BLOCK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+
+
+def _canonical_json(value: Any) -> str:
+    """Serialize with sorted keys and minimal separators."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+# Canonical JSON of recent plain-text messages; every request re-hashes the same conversation prefix.
+# Bounded by the total characters of cached contents and their JSON, so large pasted contexts
+# cannot keep unbounded memory alive.
+CANONICAL_CACHE_MAX_CHARS = 8 * 1024 * 1024
+_canonical_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_canonical_cache_chars = 0
+_canonical_cache_lock = threading.Lock()
+
+
+def _canonical_text_message(role: str, content: str) -> str:
+    """Canonical JSON of a plain-text message, memoized in a size-bounded LRU."""
+    global _canonical_cache_chars
+    key = (role, content)
+    with _canonical_cache_lock:
+        canonical = _canonical_cache.get(key)
+        if canonical is not None:
+            _canonical_cache.move_to_end(key)
+            return canonical
+
+    stripped = content
+    if role == "assistant":
+        # Strip ALL <think>...</think> blocks regardless of position.
+        # In streaming mode the think block is appended at the end;
+        # in non-streaming mode it is prepended at the start.
+        stripped = _THINK_BLOCK_RE.sub('', content).strip()
+    canonical = _canonical_json({"role": role, "content": stripped})
+
+    size = len(content) + len(canonical)
+    if size > CANONICAL_CACHE_MAX_CHARS:
+        return canonical
+    with _canonical_cache_lock:
+        if key not in _canonical_cache:
+            _canonical_cache_chars += size
+        _canonical_cache[key] = canonical
+        _canonical_cache.move_to_end(key)
+        while _canonical_cache_chars > CANONICAL_CACHE_MAX_CHARS:
+            (_, evicted_content), evicted = _canonical_cache.popitem(last=False)
+            _canonical_cache_chars -= len(evicted_content) + len(evicted)
+    return canonical
+
+
+def _canonical_message(msg: Any) -> Optional[str]:
+    """Canonical JSON of a message's role and content, or None for unsupported types."""
+    if isinstance(msg, dict):
+        role, content = msg.get("role"), msg.get("content")
+    elif hasattr(msg, "model_dump") or hasattr(msg, "dict"):
+        content = getattr(msg, "content", None)
+        if isinstance(content, str):
+            # Plain-text message: no need to dump the whole model
+            role = getattr(msg, "role", None)
+        else:
+            # Pydantic v2 / v1
+            d = msg.model_dump() if hasattr(msg, "model_dump") else msg.dict()
+            role, content = d.get("role"), d.get("content")
+    else:
+        return None
+
+    if isinstance(role, str) and isinstance(content, str):
+        return _canonical_text_message(role, content)
+    return _canonical_json({"role": role, "content": content})
+
+
+class HistoryHasher:
+    """
+    Running SHA-256 over the canonical JSON list of messages.
+
+    The digest equals hashing the whole list dumped with sorted keys and minimal
+    separators, so a history hash can be extended with new messages instead of
+    re-hashing the full conversation.
+    """
+
+    def __init__(self):
+        self._sha = hashlib.sha256(b"[")
+        self._count = 0
+
+    def update(self, messages: List[Any]) -> "HistoryHasher":
+        """Append messages (unsupported types are skipped) and return self."""
+        for msg in messages:
+            canonical = _canonical_message(msg)
+            if canonical is None:
+                continue # Skip unknown types
+            if self._count:
+                self._sha.update(b",")
+            self._sha.update(canonical.encode('utf-8'))
+            self._count += 1
+        return self
+
+    def copy(self) -> "HistoryHasher":
+        """Independent hasher with the same state."""
+        clone = HistoryHasher.__new__(HistoryHasher)
+        clone._sha = self._sha.copy()
+        clone._count = self._count
+        return clone
+
+    def extend(self, messages: List[Any]) -> "HistoryHasher":
+        """Return a new hasher with messages appended, leaving this one unchanged."""
+        return self.copy().update(messages)
+
+    def hexdigest(self) -> str:
+        sha = self._sha.copy()
+        sha.update(b"]")
+        return sha.hexdigest()
+
+
 class SessionManager:
     def __init__(self, storage_path: str = "sessions.json", workspace_base: Optional[str] = None):
         self.storage_path = storage_path
@@ -49,40 +164,14 @@ class SessionManager:
         Scope: role, content.
         Supports both dict and Pydantic Message objects.
         """
-        # Filter relevant fields to ensure consistency
-        canonical_messages = []
-        for msg in messages:
-            if hasattr(msg, "model_dump"):
-                # Pydantic v2
-                d = msg.model_dump()
-            elif hasattr(msg, "dict"):
-                # Pydantic v1
-                d = msg.dict()
-            elif isinstance(msg, dict):
-                d = msg
-            else:
-                continue # Skip unknown types
+        return self.history_hasher(messages).hexdigest()
 
-            clean_msg = {
-                "role": d.get("role"),
-                "content": d.get("content")
-            }
-            if clean_msg["role"] == "assistant" and isinstance(clean_msg["content"], str):
-                # Strip ALL <think>...</think> blocks regardless of position.
-                # In streaming mode the think block is appended at the end;
-                # in non-streaming mode it is prepended at the start.
-                content = re.sub(r'<think>.*?</think>', '', clean_msg["content"], flags=re.DOTALL)
-                clean_msg["content"] = content.strip()
-            canonical_messages.append(clean_msg)
-
-        # Serialize with sorted keys and minimal separators
-        json_str = json.dumps(
-            canonical_messages, 
-            sort_keys=True, 
-            separators=(',', ':')
-        )
-        
-        return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+    def history_hasher(self, messages: List[Any]) -> "HistoryHasher":
+        """
+        Return an incremental hasher over messages. Extending it with later
+        messages gives the same hash as calculate_history_hash on the full history.
+        """
+        return HistoryHasher().update(messages)
 
     def load_sessions(self) -> Dict[str, Any]:
         """Load sessions with file lock."""
@@ -138,10 +227,11 @@ class SessionManager:
             logger.error(f"IOError saving session: {e}")
             raise RuntimeError(f"Storage error: {e}")
 
-    def create_session(self, history_hash: str, title: str = "New Chat", custom_workspace: Optional[str] = None) -> str:
+    def create_session(self, history_hash: str, title: str = "New Chat", custom_workspace: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new session by calling cursor-agent.
-        Save to storage.
+        Save to storage and return the stored session data
+        (session_id, title, timestamps and workspace_dir).
         
         Args:
             history_hash: Hash of message history
@@ -248,7 +338,7 @@ class SessionManager:
             
             self.save_session(history_hash, session_data)
             
-            return session_id
+            return session_data
             
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to create cursor-agent session: {e}")
@@ -267,6 +357,13 @@ class SessionManager:
             logger.error(f"cursor-agent binary not found at {CURSOR_BIN}")
             raise RuntimeError(f"cursor-agent CLI not found at {CURSOR_BIN}")
 
+    async def async_create_session(self, history_hash: str, title: str = "New Chat", custom_workspace: Optional[str] = None) -> Dict[str, Any]:
+        """Run create_session in the default executor; create-chat can take seconds and must not block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.create_session, history_hash, title, custom_workspace=custom_workspace)
+        )
+
     def update_session_hash(self, old_hash: str, new_hash: str):
         """
         Move a session from old_hash to new_hash.
@@ -280,11 +377,21 @@ class SessionManager:
         session["updated_at"] = datetime.now(timezone.utc).isoformat()
         self.save_session(new_hash, session, old_hash=old_hash)
 
+    async def async_update_session_hash(self, old_hash: str, new_hash: str):
+        """Run update_session_hash in the default executor so the file lock and I/O don't block the event loop."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.update_session_hash, old_hash, new_hash)
+
     def get_session_by_hash(self, history_hash: str) -> Optional[Dict[str, Any]]:
         """Retrieve session data by history hash."""
         data = self.load_sessions()
         return data.get("sessions", {}).get(history_hash)
 
+    async def async_get_session_by_hash(self, history_hash: str) -> Optional[Dict[str, Any]]:
+        """Run get_session_by_hash in the default executor so the file lock and read don't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_session_by_hash, history_hash)
+
     def get_session_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve session data by session_id."""
         if not session_id:
@@ -295,6 +402,11 @@ class SessionManager:
                 return session
         return None
 
+    async def async_get_session_by_id(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Run get_session_by_id in the default executor so the file lock and read don't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_session_by_id, session_id)
+
     def get_hash_by_session_id(self, session_id: str) -> Optional[str]:
         """Retrieve history hash by session_id."""
         if not session_id:
@@ -303,4 +415,9 @@ class SessionManager:
         for history_hash, session in data.get("sessions", {}).items():
             if session.get("session_id") == session_id:
                 return history_hash
-        return None
\ No newline at end of file
+        return None
+
+    async def async_get_hash_by_session_id(self, session_id: str) -> Optional[str]:
+        """Run get_hash_by_session_id in the default executor so the file lock and read don't block the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.get_hash_by_session_id, session_id)
\ No newline at end of file
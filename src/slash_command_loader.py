@@ -1,14 +1,29 @@
+import functools
 import json
 import os
 import re
 from html import escape as xml_escape
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 from loguru import logger
 
 PLUGIN_COMMAND_EXTENSIONS = ("*.md", "*.mdc", "*.markdown", "*.txt")
 
 
+@functools.lru_cache(maxsize=1024)
+def _read_title(filepath: str, mtime_ns: int) -> Optional[str]:
+    """First markdown heading of a file; keyed on mtime so edited files are re-read."""
+    try:
+        content = Path(filepath).read_text(encoding="utf-8")
+    except Exception:
+        return None
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            return stripped.lstrip("#").strip() or None
+    return None
+
+
 class SlashCommandLoader:
     """Load custom slash commands, skills, and agents from .cursor/, .claude/, and plugin directories.
 
@@ -28,10 +43,11 @@ class SlashCommandLoader:
         self._current_source: Optional[str] = None
         self._load_all()
 
-    def _load_all(self):
-        """Load entries in priority order (later overrides earlier for same command_id).
+    @staticmethod
+    def _scan_plan(workspace: Path, home: Path) -> List[Tuple[str, Optional[str], Path]]:
+        """Directories scanned by _load_all as (kind, source, directory), in priority order.
 
-        Priority:
+        Priority (later overrides earlier for same command_id):
         1.  User-level plugins (~/.cursor/plugins/cache/, ~/.cursor/plugins/local/)
         2.  Project-level plugins (<workspace>/.cursor/plugins/)
         3.  Project .claude/commands/
@@ -44,27 +60,70 @@ class SlashCommandLoader:
         10. User .cursor/skills-cursor/
         11. User .cursor/agents/
         """
-        workspace = Path(self.workspace_dir)
-        home = Path.home()
-
-        # Plugins (lowest priority, source tracked per-plugin via _current_plugin_name)
-        self._load_plugins_from(home / ".cursor" / "plugins")
-        self._load_plugins_from(workspace / ".cursor" / "plugins")
-
-        # Project-level
-        self._current_source = "project"
-        self._load_commands_dir(workspace / ".claude" / "commands")
-        self._load_commands_dir(workspace / ".cursor" / "commands")
-        self._load_skills_dir(workspace / ".cursor" / "skills")
-        self._load_agents_dir(workspace / ".cursor" / "agents")
-
-        # User-level
-        self._current_source = "user"
-        self._load_commands_dir(home / ".claude" / "commands")
-        self._load_commands_dir(home / ".cursor" / "commands")
-        self._load_skills_dir(home / ".cursor" / "skills")
-        self._load_skills_dir(home / ".cursor" / "skills-cursor")
-        self._load_agents_dir(home / ".cursor" / "agents")
+        return [
+            # Plugins (lowest priority, source tracked per-plugin via _current_plugin_name)
+            ("plugins", None, home / ".cursor" / "plugins"),
+            ("plugins", None, workspace / ".cursor" / "plugins"),
+            # Project-level
+            ("commands", "project", workspace / ".claude" / "commands"),
+            ("commands", "project", workspace / ".cursor" / "commands"),
+            ("skills", "project", workspace / ".cursor" / "skills"),
+            ("agents", "project", workspace / ".cursor" / "agents"),
+            # User-level
+            ("commands", "user", home / ".claude" / "commands"),
+            ("commands", "user", home / ".cursor" / "commands"),
+            ("skills", "user", home / ".cursor" / "skills"),
+            ("skills", "user", home / ".cursor" / "skills-cursor"),
+            ("agents", "user", home / ".cursor" / "agents"),
+        ]
+
+    @staticmethod
+    def _tree_mtimes(directory: Path) -> Tuple[int, ...]:
+        """Modification times (and file sizes) of a directory tree: every directory and file below it.
+
+        Symlinked subdirectories are not followed, matching the rglob scans of the loaders.
+        Empty for a missing directory.
+        """
+        stamps = []
+        for dirpath, dirnames, filenames in os.walk(directory):
+            # Walk in a stable order so an unchanged tree gives the same signature
+            dirnames.sort()
+            try:
+                stamps.append(os.stat(dirpath).st_mtime_ns)
+            except OSError:
+                continue
+            for filename in sorted(filenames):
+                try:
+                    st = os.stat(os.path.join(dirpath, filename))
+                except OSError:
+                    continue
+                stamps.append(st.st_mtime_ns)
+                stamps.append(st.st_size)
+        return tuple(stamps)
+
+    @classmethod
+    def scan_signature(cls, workspace_dir: Optional[str] = None) -> Tuple[Tuple[int, ...], ...]:
+        """Modification times of every directory and file the loaders walk, used to detect changed entries.
+
+        Adding, removing or renaming an entry changes its parent directory, however deeply
+        it is nested (e.g. a plugin installed under an existing plugins/cache/<vendor>/ folder).
+        Writing a file in place changes its own mtime and size, which covers entries that were
+        empty when loaded and edited frontmatter descriptions. Files are stat'ed, never read.
+        """
+        workspace = Path(workspace_dir or os.getcwd())
+        return tuple(cls._tree_mtimes(directory) for _, _, directory in cls._scan_plan(workspace, Path.home()))
+
+    def _load_all(self):
+        """Load entries in priority order (later overrides earlier for same command_id)."""
+        loaders = {
+            "plugins": self._load_plugins_from,
+            "commands": self._load_commands_dir,
+            "skills": self._load_skills_dir,
+            "agents": self._load_agents_dir,
+        }
+        for kind, source, directory in self._scan_plan(Path(self.workspace_dir), Path.home()):
+            self._current_source = source
+            loaders[kind](directory)
         self._current_source = None
 
     def _load_commands_dir(self, directory: Path, extensions: Sequence[str] = ("*.md",)):
@@ -239,14 +298,10 @@ class SlashCommandLoader:
     def _extract_title(self, filepath: str) -> Optional[str]:
         """Extract the first markdown heading (line starting with #) from the file."""
         try:
-            content = Path(filepath).read_text(encoding="utf-8")
-        except Exception:
+            mtime_ns = os.stat(filepath).st_mtime_ns
+        except OSError:
             return None
-        for line in content.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("#"):
-                return stripped.lstrip("#").strip() or None
-        return None
+        return _read_title(filepath, mtime_ns)
 
     def get_command_labels(self) -> List[str]:
         """Return labeled entries, e.g. (command [superpowers]: Brainstorm) /brainstorm."""
@@ -313,7 +368,7 @@ class SlashCommandLoader:
         args_text = match.group(2) or ""
 
         if command_id not in self.entries:
-            logger.debug(f"/{command_id} not found in entries, passing through")
+            logger.debug("/{} not found in entries, passing through", command_id)
             return text
 
         entry = self.entries[command_id]
@@ -0,0 +1,104 @@
+"""
+Coalescing of small stream chunks into larger SSE frames, and SSE keep-alive.
+"""
+import asyncio
+from typing import AsyncIterator, List
+
+# Flush buffered text once it reaches this many characters...
+STREAM_FLUSH_SIZE = 8192
+# ...or once the oldest buffered chunk has waited this long (seconds)
+STREAM_FLUSH_INTERVAL = 0.025
+
+# Send an SSE comment after this many idle seconds so proxies keep the connection open
+SSE_KEEPALIVE_INTERVAL = 15.0
+SSE_KEEPALIVE_FRAME = b": keep-alive\n\n"
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterator[str],
+    flush_size: int = STREAM_FLUSH_SIZE,
+    flush_interval: float = STREAM_FLUSH_INTERVAL,
+) -> AsyncIterator[str]:
+    """
+    Merge consecutive chunks from an async iterator, yielding the joined text when
+    either flush_size characters are buffered or flush_interval has elapsed since
+    the first buffered chunk. Exceptions from the source are re-raised after the
+    buffered text has been yielded.
+    """
+    iterator = chunks.__aiter__()
+    loop = asyncio.get_running_loop()
+    buffer: List[str] = []
+    buffered_size = 0
+    deadline = 0.0
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            # asyncio.wait does not cancel the pending read on timeout, so no chunk is lost
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield "".join(buffer)
+                buffer = []
+                buffered_size = 0
+                continue
+
+            task, pending = pending, None
+            try:
+                chunk = task.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                if buffer:
+                    yield "".join(buffer)
+                    buffer = []
+                raise
+
+            if not buffer:
+                deadline = loop.time() + flush_interval
+            buffer.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= flush_size:
+                yield "".join(buffer)
+                buffer = []
+                buffered_size = 0
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def with_keepalive(
+    frames: AsyncIterator[bytes],
+    interval: float = SSE_KEEPALIVE_INTERVAL,
+    keepalive: bytes = SSE_KEEPALIVE_FRAME,
+) -> AsyncIterator[bytes]:
+    """
+    Pass frames through from an async iterator, yielding keepalive whenever no
+    frame has arrived for interval seconds (e.g. while cursor-agent runs a tool).
+    """
+    iterator = frames.__aiter__()
+    pending = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield keepalive
+                continue
+
+            task, pending = pending, None
+            try:
+                frame = task.result()
+            except StopAsyncIteration:
+                break
+            yield frame
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -3,12 +3,60 @@ Tag parsing utilities for extracting workspace and session_id from messages.
 """
 import os
 import re
-from typing import List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from loguru import logger
 from src.config import config
 from src.models import Message
 
+_WORKSPACE_TAG_RE = re.compile(r'<workspace>\s*(.+?)\s*</workspace>', re.DOTALL)
+_SESSION_ID_TAG_RE = re.compile(r'<session_id>\s*(.+?)\s*</session_id>', re.DOTALL)
+# Both system prompt tags, so a message needing both is scanned once
+_CONTEXT_TAG_RE = re.compile(r'<(workspace|session_id)>\s*(.+?)\s*</\1>', re.DOTALL)
+_CONTEXT_TAGS = frozenset(("workspace", "session_id"))
+
+
+def _extract_tag(pattern: re.Pattern, content: str) -> Tuple[Optional[str], str]:
+    """
+    Remove every match of a tag pattern in one pass over content.
+    Returns the first match's value (stripped) and the stripped remaining content,
+    or (None, content) when there is no match.
+    """
+    values: List[str] = []
+
+    def _remove(match) -> str:
+        values.append(match.group(1))
+        return ''
+
+    cleaned_content = pattern.sub(_remove, content)
+    if not values:
+        return None, content
+    return values[0].strip(), cleaned_content.strip()
+
+
+def _extract_context_tags(content: str, wanted: FrozenSet[str]) -> Tuple[Dict[str, str], str]:
+    """
+    Remove the wanted <workspace>/<session_id> tags from content in one pass.
+    Returns the first value (stripped) of each tag found and the stripped remaining content,
+    or ({}, content) when none of the wanted tags is present.
+    """
+    values: Dict[str, str] = {}
+
+    def _remove(match) -> str:
+        name = match.group(1)
+        if name not in wanted:
+            return match.group(0)
+        values.setdefault(name, match.group(2).strip())
+        return ''
+
+    # Substring checks are far cheaper than a regex scan when the tags are absent (the usual case)
+    if not any(f"<{name}>" in content for name in wanted):
+        return values, content
+    cleaned_content = _CONTEXT_TAG_RE.sub(_remove, content)
+    if not values:
+        return values, content
+    return values, cleaned_content.strip()
+
 
 def parse_workspace_tag(content: str) -> Tuple[Optional[str], str]:
     """
@@ -19,17 +67,14 @@ def parse_workspace_tag(content: str) -> Tuple[Optional[str], str]:
         - workspace_path: The extracted path or None if not found
         - cleaned_content: The content with the workspace tag removed
     """
-    pattern = r'<workspace>\s*(.+?)\s*</workspace>'
-    match = re.search(pattern, content, re.DOTALL)
-    
-    if not match:
+    # Substring check is far cheaper than a regex scan when the tag is absent (the usual case)
+    if "<workspace>" not in content:
+        return None, content
+    workspace_path, cleaned_content = _extract_tag(_WORKSPACE_TAG_RE, content)
+    if workspace_path is None:
         return None, content
     
-    workspace_path = match.group(1).strip()
-    # Remove the tag from content
-    cleaned_content = re.sub(pattern, '', content, flags=re.DOTALL).strip()
-    
-    logger.debug(f"Extracted workspace tag: {workspace_path}")
+    logger.debug("Extracted workspace tag: {}", workspace_path)
     return workspace_path, cleaned_content
 
 
@@ -42,17 +87,14 @@ def parse_session_id_tag(content: str) -> Tuple[Optional[str], str]:
         - session_id: The extracted session_id or None if not found
         - cleaned_content: The content with the session_id tag removed
     """
-    pattern = r'<session_id>\s*(.+?)\s*</session_id>'
-    match = re.search(pattern, content, re.DOTALL)
-    
-    if not match:
+    # Substring check is far cheaper than a regex scan when the tag is absent (the usual case)
+    if "<session_id>" not in content:
+        return None, content
+    session_id, cleaned_content = _extract_tag(_SESSION_ID_TAG_RE, content)
+    if session_id is None:
         return None, content
     
-    session_id = match.group(1).strip()
-    # Remove the tag from content
-    cleaned_content = re.sub(pattern, '', content, flags=re.DOTALL).strip()
-    
-    logger.debug(f"Extracted session_id tag: {session_id}")
+    logger.debug("Extracted session_id tag: {}", session_id)
     return session_id, cleaned_content
 
 
@@ -71,8 +113,8 @@ def validate_workspace_path(path: Optional[str]) -> Optional[str]:
         logger.warning(f"Workspace path '{path}' is not absolute, ignoring")
         return None
     
-    # Get whitelist from config
-    whitelist = config.get_workspace_whitelist()
+    # Get whitelist from config, already normalized
+    whitelist = config.get_workspace_whitelist_normalized()
     
     # If whitelist is empty, no custom workspace allowed
     if not whitelist:
@@ -81,10 +123,9 @@ def validate_workspace_path(path: Optional[str]) -> Optional[str]:
     
     # Check if path is in whitelist (exact match or subdirectory)
     path_normalized = os.path.normpath(path)
-    for allowed_path in whitelist:
-        allowed_normalized = os.path.normpath(allowed_path)
+    for allowed_normalized, allowed_prefix in whitelist:
         # Check exact match or if path is under allowed path
-        if path_normalized == allowed_normalized or path_normalized.startswith(allowed_normalized + os.sep):
+        if path_normalized == allowed_normalized or path_normalized.startswith(allowed_prefix):
             logger.info(f"Workspace path '{path}' validated against whitelist")
             return path
     
@@ -99,7 +140,8 @@ def extract_workspace_from_messages(messages: List[Message]) -> Tuple[Optional[s
     Returns:
         Tuple of (validated_workspace_path, session_id, cleaned_messages)
     """
-    if not messages:
+    # Tags only live in system messages; without one there is nothing to clean
+    if not messages or not any(msg.role == "system" for msg in messages):
         return None, None, messages
     
     workspace_path = None
@@ -109,23 +151,30 @@ def extract_workspace_from_messages(messages: List[Message]) -> Tuple[Optional[s
     for msg in messages:
         # Only look for workspace and session_id tags in system messages
         if msg.role == "system":
-            cleaned_content = msg.get_text_content()
+            # Only tags not already found in an earlier system message are extracted
+            wanted = _CONTEXT_TAGS
+            if workspace_path is not None:
+                wanted = wanted - {"workspace"}
+            if session_id is not None:
+                wanted = wanted - {"session_id"}
+            tags, cleaned_content = _extract_context_tags(msg.get_text_content(), wanted)
             
             # Extract workspace tag
-            if workspace_path is None:
-                extracted_path, cleaned_content = parse_workspace_tag(cleaned_content)
-                if extracted_path:
-                    workspace_path = validate_workspace_path(extracted_path)
+            if tags.get("workspace"):
+                logger.debug("Extracted workspace tag: {}", tags["workspace"])
+                workspace_path = validate_workspace_path(tags["workspace"])
             
             # Extract session_id tag
-            if session_id is None:
-                extracted_session_id, cleaned_content = parse_session_id_tag(cleaned_content)
-                if extracted_session_id:
-                    session_id = extracted_session_id
-                    logger.info(f"Extracted custom session_id from system prompt: {session_id}")
+            if tags.get("session_id"):
+                session_id = tags["session_id"]
+                logger.info(f"Extracted custom session_id from system prompt: {session_id}")
             
-            # Create new message with cleaned content
-            cleaned_messages.append(Message(role=msg.role, content=cleaned_content))
+            if cleaned_content is msg.content:
+                # No tag removed from plain-text content: reuse the original message
+                cleaned_messages.append(msg)
+            else:
+                # Create new message with cleaned content
+                cleaned_messages.append(Message(role=msg.role, content=cleaned_content))
         else:
             cleaned_messages.append(msg)
     
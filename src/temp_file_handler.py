@@ -4,8 +4,17 @@ Temporary file handling utilities for saving content and images.
 import os
 import hashlib
 import base64
+import tempfile
+import threading
+from collections import OrderedDict
 from typing import Optional, Tuple
 
+try:
+    import pybase64
+    _b64decode = pybase64.b64decode
+except ImportError:  # pybase64 is optional; its SIMD decoder is a drop-in for base64.b64decode
+    _b64decode = base64.b64decode
+
 from loguru import logger
 from src.config import CURSOR_CLI_PROXY_TMP
 
@@ -14,17 +23,68 @@ from src.config import CURSOR_CLI_PROXY_TMP
 # Command line limit is typically 128KB-2MB, but let's be conservative
 CONTENT_SIZE_THRESHOLD = 4000
 
+# Base64 characters decoded per write; a multiple of 4 so each slice decodes on its own
+IMAGE_DECODE_CHUNK_SIZE = 64 * 1024
+
+# Bytes outside the base64 alphabet; the non-validating decoder discards them (e.g. line wrapping)
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_NON_BASE64_BYTES = bytes(b for b in range(256) if b not in _BASE64_ALPHABET)
+
+# Paths of recently saved contents; chats re-send the same large context every turn.
+# Keyed on the content itself, so a hit costs a string hash and compare instead of encode + hash + write.
+# Bounded by the total characters of cached contents.
+CONTENT_PATH_CACHE_MAX_CHARS = 16 * 1024 * 1024
+_content_path_cache: "OrderedDict[Tuple[str, str, Optional[str], Optional[str]], str]" = OrderedDict()
+_content_path_cache_chars = 0
+_content_path_cache_lock = threading.Lock()
+
+
+def _cached_content_path(key: Tuple[str, str, Optional[str], Optional[str]]) -> Optional[str]:
+    """Return the cached path for key if its file still exists."""
+    with _content_path_cache_lock:
+        filepath = _content_path_cache.get(key)
+        if filepath is None:
+            return None
+        _content_path_cache.move_to_end(key)
+    # The temp directory may have been cleaned up since the file was written
+    return filepath if os.path.exists(filepath) else None
+
+
+def _cache_content_path(key: Tuple[str, str, Optional[str], Optional[str]], filepath: str):
+    """Remember filepath for key, evicting the least recently used contents beyond the size bound."""
+    global _content_path_cache_chars
+    size = len(key[1])
+    if size > CONTENT_PATH_CACHE_MAX_CHARS:
+        return
+    with _content_path_cache_lock:
+        if key not in _content_path_cache:
+            _content_path_cache_chars += size
+        _content_path_cache[key] = filepath
+        _content_path_cache.move_to_end(key)
+        while _content_path_cache_chars > CONTENT_PATH_CACHE_MAX_CHARS:
+            evicted, _ = _content_path_cache.popitem(last=False)
+            _content_path_cache_chars -= len(evicted[1])
+
 
 def save_content_to_temp_file(content: str, filename_hint: str = None, extension: str = None) -> str:
     """
     Save text content to a temporary file and return the file path.
     Uses a hash-based filename to avoid duplicates.
     """
+    # Same content, naming and directory as a recent save: the file is already there
+    cache_key = (CURSOR_CLI_PROXY_TMP, content, filename_hint, extension)
+    cached_path = _cached_content_path(cache_key)
+    if cached_path is not None:
+        return cached_path
+    
     # Create temp directory if not exists
     os.makedirs(CURSOR_CLI_PROXY_TMP, exist_ok=True)
     
+    # Encode once: the same bytes are hashed and written
+    data = content.encode("utf-8")
+    
     # Generate unique filename based on content hash
-    content_hash = hashlib.md5(content.encode()).hexdigest()[:12]
+    content_hash = hashlib.md5(data).hexdigest()[:12]
     
     # Determine file extension
     ext = extension or ".txt"
@@ -39,11 +99,12 @@ def save_content_to_temp_file(content: str, filename_hint: str = None, extension
     filename = f"upload_{content_hash}{ext}"
     filepath = os.path.join(CURSOR_CLI_PROXY_TMP, filename)
     
-    # Write content to file
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Write content to file in a single buffered write (temp files need no fsync)
+    with open(filepath, "wb") as f:
+        f.write(data)
     
-    logger.debug(f"Saved text content to temp file: {filepath} ({len(content)} bytes)")
+    logger.debug("Saved text content to temp file: {} ({} bytes)", filepath, len(content))
+    _cache_content_path(cache_key, filepath)
     return filepath
 
 
@@ -76,22 +137,38 @@ def save_image_to_temp_file(data_url: str) -> Optional[str]:
         }
         ext = ext_map.get(mime_type, ".png")
         
-        # Decode base64
-        image_data = base64.b64decode(encoded)
-        
-        # Generate filename
-        content_hash = hashlib.md5(image_data).hexdigest()[:12]
-        filename = f"image_{content_hash}{ext}"
-        filepath = os.path.join(CURSOR_CLI_PROXY_TMP, filename)
-        
         # Create temp directory if not exists
         os.makedirs(CURSOR_CLI_PROXY_TMP, exist_ok=True)
         
-        # Write image to file
-        with open(filepath, "wb") as f:
-            f.write(image_data)
+        # Drop wrapping and other non-alphabet bytes up front, as the decoder would, so every
+        # slice below holds a multiple of 4 base64 characters
+        data = encoded.encode("ascii").translate(None, _NON_BASE64_BYTES)
+        # Padding before the end stops the decoder there; slices would decode past it
+        slice_size = len(data) if b"=" in data[:-2] else IMAGE_DECODE_CHUNK_SIZE
+        
+        # Decode, hash and write slice by slice so the decoded image is never held whole,
+        # then move the file to its hash-based name
+        digest = hashlib.md5()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=CURSOR_CLI_PROXY_TMP, prefix=".image_", suffix=ext)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for start in range(0, len(data), slice_size):
+                    chunk = _b64decode(data[start:start + slice_size])
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            filename = f"image_{digest.hexdigest()[:12]}{ext}"
+            filepath = os.path.join(CURSOR_CLI_PROXY_TMP, filename)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
         
-        logger.debug(f"Saved image to temp file: {filepath} ({len(image_data)} bytes)")
+        logger.debug("Saved image to temp file: {} ({} bytes)", filepath, size)
         return filepath
         
     except Exception as e:
@@ -105,19 +182,19 @@ def extract_filename_and_content(text: str) -> Tuple[Optional[str], str]:
     Pattern: "filename.ext\n<actual content>"
     Returns (None, original_text) if no filename pattern detected.
     """
-    lines = text.split("\n", 1)
-    if len(lines) < 2:
+    # Find the first line without splitting, so the tail is only copied once a filename is detected
+    newline = text.find("\n")
+    if newline < 0:
         return None, text
     
-    first_line = lines[0].strip()
-    rest_content = lines[1]
+    first_line = text[:newline].strip()
     
     # Check if first line looks like a filename (has extension, reasonable length, no spaces at start)
     if len(first_line) < 300 and "." in first_line and not first_line.startswith(" "):
         # Check if it has a valid-looking extension
         ext = first_line.rsplit(".", 1)[-1].lower()
         if len(ext) <= 10 and ext.isalnum():
-            logger.debug(f"Detected filename: {first_line}")
-            return first_line, rest_content
+            logger.debug("Detected filename: {}", first_line)
+            return first_line, text[newline + 1:]
     
     return None, text
@@ -4,7 +4,7 @@ from loguru import logger
 
 def format_tool_call_start(tool_call: dict, tool_count: int) -> Optional[str]:
     """Format tool call start information for output"""
-    logger.debug(f"Tool call: {tool_call}")
+    logger.debug("Tool call: {}", tool_call)
     # Handle writeToolCall
     if "writeToolCall" in tool_call:
         args = tool_call["writeToolCall"].get("args", {})
@@ -3,6 +3,7 @@ import os
 from unittest.mock import patch, MagicMock
 from src.models import ChatCompletionRequest, Message
 from src.model_registry import model_registry
+from src.command_builder import CommandBuilder
 
 
 def make_popen_mock(session_id: str, poll_returncode=None, final_returncode=None) -> MagicMock:
@@ -43,6 +44,12 @@ def reset_registry(tmp_path):
         # Temp file is automatically cleaned up by tmp_path, but we can be explicit if we want
         # but pytest handles tmp_path cleanup.
 
+@pytest.fixture(autouse=True)
+def reset_slash_loader_cache():
+    CommandBuilder.clear_slash_loader_cache()
+    yield
+    CommandBuilder.clear_slash_loader_cache()
+
 @pytest.fixture
 def valid_request():
     return ChatCompletionRequest(
@@ -133,6 +133,32 @@ def test_stream_empty_executor_no_think_block_or_done():
         assert not has_finish_stop, "Should not emit finish_reason=stop when executor produced no output"
 
 
+def test_stream_events_without_text_finishes_empty_reply():
+    """When the CLI emits events but no text, the stream still finishes with final_chunk and [DONE]."""
+    config.ENABLE_INFO_IN_THINK = True
+
+    async def silent_stream(*args, stats=None, **kwargs):
+        stats.events += 2  # e.g. system init and result events
+        if False:
+            yield
+
+    with patch.object(Executor, 'run_stream', side_effect=silent_stream), \
+            patch("src.main.session_manager.async_update_session_hash", new_callable=AsyncMock) as mock_update:
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "auto", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+            headers={"Authorization": "Bearer sk-test"}
+        )
+        assert response.status_code == 200
+
+        lines = [line for line in response.iter_lines() if line]
+        assert lines[-1] == "data: [DONE]"
+        chunks = [json.loads(line[6:]) for line in lines[:-1]]
+        assert [c["choices"][0]["finish_reason"] for c in chunks] == ["stop"]
+        assert "content" not in chunks[0]["choices"][0]["delta"]
+        mock_update.assert_awaited_once()
+
+
 def test_non_stream_empty_executor_no_think_block():
     """When executor returns empty content in non-stream mode, should return empty content, not think_block."""
     config.ENABLE_INFO_IN_THINK = True
@@ -181,3 +207,86 @@ def test_think_block_built_only_when_content_present():
                 headers={"Authorization": "Bearer sk-test"}
             )
         assert len(build_calls) == 1, "get_command_labels should be called when executor returns content"
+
+
+def test_stream_content_frames_match_chunk_model():
+    """Templated content frames should serialize exactly like ChatCompletionChunk."""
+    from src.models import ChatCompletionChunk, ChunkChoice, ChunkDelta
+
+    text = 'He said "hi"\n中文 \\ {}'
+
+    async def fake_stream(*args, **kwargs):
+        yield text
+
+    with patch.object(Executor, 'run_stream', side_effect=fake_stream):
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "auto", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+            headers={"Authorization": "Bearer sk-test"}
+        )
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.headers["x-accel-buffering"] == "no"
+
+        frame = next(line[6:] for line in response.iter_lines() if line.startswith("data: {"))
+        data = json.loads(frame)
+        expected = ChatCompletionChunk(
+            id=data["id"],
+            created=data["created"],
+            model="auto",
+            choices=[ChunkChoice(index=0, delta=ChunkDelta(content=text))]
+        )
+        assert data == json.loads(expected.model_dump_json(exclude_none=True))
+
+        final = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: {")][-1]
+        assert final["id"] == data["id"]
+        assert final["choices"] == [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+
+
+def test_stream_error_emits_error_frame():
+    async def failing_stream(*args, **kwargs):
+        yield "partial"
+        raise RuntimeError("CLI crashed: 中文")
+
+    with patch.object(Executor, 'run_stream', side_effect=failing_stream):
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "auto", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+            headers={"Authorization": "Bearer sk-test"}
+        )
+        assert response.status_code == 200
+
+        frames = [json.loads(line[6:]) for line in response.iter_lines() if line.startswith("data: {")]
+        assert frames[0]["choices"][0]["delta"]["content"] == "partial"
+        assert frames[-1] == {"error": {"message": "CLI crashed: 中文", "type": "stream_error"}}
+
+
+def test_stream_updates_session_hash_before_done():
+    """The session hash is moved before [DONE], so the client's next turn finds it."""
+    from src import main
+
+    events = []
+
+    async def fake_stream(*args, **kwargs):
+        yield "Hello"
+
+    async def recording_update(old_hash, new_hash):
+        events.append("update")
+
+    async def recording_frames(frames):
+        async for frame in frames:
+            if frame == main._SSE_DONE:
+                events.append("done")
+            yield frame
+
+    with patch.object(Executor, 'run_stream', side_effect=fake_stream), \
+            patch.object(main.session_manager, "async_update_session_hash", side_effect=recording_update), \
+            patch("src.main.with_keepalive", recording_frames):
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "auto", "messages": [{"role": "user", "content": "hi"}], "stream": True},
+            headers={"Authorization": "Bearer sk-test"}
+        )
+        assert response.status_code == 200
+
+    assert events == ["update", "done"]
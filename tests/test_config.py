@@ -1,7 +1,7 @@
 import os
 import pytest
 from unittest.mock import patch
-from src.config import Settings
+from src.config import Settings, get_config
 
 def test_settings_defaults():
     # 確保不受外部環境影響
@@ -38,4 +38,9 @@ def test_settings_load_env_file(temp_env_file):
     with patch.dict(os.environ, {}, clear=True):
         settings = Settings(_env_file=temp_env_file)
         assert settings.PORT == 6000
-        assert settings.LOG_LEVEL == "WARNING"
\ No newline at end of file
+        assert settings.LOG_LEVEL == "WARNING"
+
+def test_config_is_lazily_built_singleton():
+    import src.config
+    assert get_config() is get_config()
+    assert src.config.config is get_config()
@@ -3,6 +3,7 @@ import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 
+from src import executor as executor_module
 from src.executor import Executor
 
 
@@ -112,6 +113,50 @@ class TestRunNonStreamCleanup:
         assert result == "ok"
         process.terminate.assert_called_once()
 
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_returns_result_split_across_chunks(self, mock_create, executor):
+        process = make_mock_process(returncode=None)
+        process.stdout.read = AsyncMock(side_effect=[b'{"result": "he', b'llo", "x": {}', b'}\n', b""])
+        mock_create.return_value = process
+
+        async def fake_wait():
+            type(process).returncode = PropertyMock(return_value=0)
+        process.wait = AsyncMock(side_effect=fake_wait)
+
+        result = await executor.run_non_stream(["test"])
+        assert result == "hello"
+        # Returned as soon as the object closed, without draining stdout
+        assert process.stdout.read.await_count == 3
+
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_ignores_braces_and_escaped_quotes_inside_strings(self, mock_create, executor):
+        process = make_mock_process(returncode=None)
+        process.stdout.read = AsyncMock(side_effect=[b'{"result": "a } \\', b'" {", "n": 1', b'}', b""])
+        mock_create.return_value = process
+
+        async def fake_wait():
+            type(process).returncode = PropertyMock(return_value=0)
+        process.wait = AsyncMock(side_effect=fake_wait)
+
+        with patch("src.executor._json_loads", wraps=executor_module._json_loads) as mock_json_loads:
+            result = await executor.run_non_stream(["test"])
+        assert result == 'a } " {'
+        # Only the final, complete object is parsed
+        assert mock_json_loads.call_count == 1
+
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_returns_raw_output_when_not_json(self, mock_create, executor):
+        process = make_mock_process(returncode=None)
+        process.stdout.read = AsyncMock(side_effect=[b"plain ", b"text\n", b""])
+        mock_create.return_value = process
+
+        async def fake_wait():
+            type(process).returncode = PropertyMock(return_value=0)
+        process.wait = AsyncMock(side_effect=fake_wait)
+
+        result = await executor.run_non_stream(["test"])
+        assert result == "plain text"
+
     @patch("src.executor.asyncio.create_subprocess_exec")
     async def test_terminates_process_on_timeout(self, mock_create, executor):
         process = make_mock_process(returncode=None)
@@ -191,3 +236,42 @@ class TestRunStreamCleanup:
         chunks = []
         async for chunk in executor.run_stream(["test"]):
             chunks.append(chunk)
+
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_stream_joins_text_items_of_assistant_message(self, mock_create, executor):
+        """Text items of one assistant message are joined; other item types are skipped."""
+        process = make_mock_process(returncode=0)
+        process.stdout = AsyncIterLines([
+            b'{"type":"assistant","timestamp_ms":1,"message":{"content":[{"type":"text","text":"Hel"}]}}\n',
+            b'{"type":"assistant","timestamp_ms":2,"message":{"content":'
+            b'[{"type":"text","text":"lo"},{"type":"image"},{"type":"text","text":" there"}]}}\n',
+            b'{"type":"result","duration_ms":100}\n',
+        ])
+        mock_create.return_value = process
+
+        chunks = [chunk async for chunk in executor.run_stream(["test"])]
+        assert chunks == ["Hel", "lo there", "\n"]
+
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_stream_failure_reports_stderr_tail(self, mock_create, executor):
+        """A failing CLI raises with only the last STDERR_TAIL_BYTES of stderr."""
+        process = make_mock_process(returncode=1)
+        process.stdout = AsyncIterLines([b'{"type":"result","duration_ms":100}\n'])
+        head = b"h" * executor_module.STDERR_TAIL_BYTES
+        process.stderr.read = AsyncMock(side_effect=[head, b"fatal: boom", b""])
+        mock_create.return_value = process
+
+        with pytest.raises(RuntimeError, match=r"code 1\): h+fatal: boom$") as excinfo:
+            async for _ in executor.run_stream(["test"]):
+                pass
+        assert len(str(excinfo.value)) < executor_module.STDERR_TAIL_BYTES + 100
+
+    @patch("src.executor.asyncio.create_subprocess_exec")
+    async def test_stream_success_does_not_read_stderr(self, mock_create, executor):
+        process = make_mock_process(returncode=0)
+        process.stdout = AsyncIterLines([b'{"type":"result","duration_ms":100}\n'])
+        mock_create.return_value = process
+
+        async for _ in executor.run_stream(["test"]):
+            pass
+        process.stderr.read.assert_not_called()
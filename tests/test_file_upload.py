@@ -2,6 +2,7 @@
 import pytest
 import os
 import base64
+import hashlib
 import tempfile
 from unittest.mock import patch
 
@@ -188,6 +189,21 @@ class TestSaveContentToTempFile:
             filepath2 = save_content_to_temp_file(content)
             
             assert filepath1 == filepath2
+    
+    def test_repeated_content_skips_rewrite(self, tmp_path):
+        """A recently saved content is not hashed or written again while its file exists."""
+        with patch("src.temp_file_handler.CURSOR_CLI_PROXY_TMP", str(tmp_path)):
+            content = "Repeated context " * 500
+            filepath1 = save_content_to_temp_file(content)
+            with patch("src.temp_file_handler.hashlib.md5") as mock_hasher:
+                filepath2 = save_content_to_temp_file(content)
+            assert filepath2 == filepath1
+            mock_hasher.assert_not_called()
+            
+            # A removed file is written again
+            os.remove(filepath1)
+            assert save_content_to_temp_file(content) == filepath1
+            assert os.path.exists(filepath1)
 
 
 class TestSaveImageToTempFile:
@@ -218,6 +234,31 @@ class TestSaveImageToTempFile:
             assert filepath is not None
             assert filepath.endswith(".png")
     
+    def test_save_large_image_in_chunks(self, tmp_path):
+        """Images spanning several decode slices are written intact under their content hash."""
+        with patch("src.temp_file_handler.CURSOR_CLI_PROXY_TMP", str(tmp_path)):
+            fake_image = os.urandom(200 * 1024)
+            data_url = f"data:image/webp;base64,{base64.b64encode(fake_image).decode()}"
+            
+            filepath = save_image_to_temp_file(data_url)
+            
+            assert os.path.basename(filepath) == f"image_{hashlib.md5(fake_image).hexdigest()[:12]}.webp"
+            with open(filepath, "rb") as f:
+                assert f.read() == fake_image
+            assert os.listdir(tmp_path) == [os.path.basename(filepath)]
+    
+    def test_save_line_wrapped_image(self, tmp_path):
+        """Base64 wrapped with newlines decodes like base64.b64decode does."""
+        with patch("src.temp_file_handler.CURSOR_CLI_PROXY_TMP", str(tmp_path)):
+            fake_image = os.urandom(100 * 1024)
+            data_url = f"data:image/png;base64,{base64.encodebytes(fake_image).decode()}"
+            
+            filepath = save_image_to_temp_file(data_url)
+            
+            assert filepath is not None
+            with open(filepath, "rb") as f:
+                assert f.read() == fake_image
+    
     def test_invalid_data_url(self):
         """Test handling of invalid data URL."""
         filepath = save_image_to_temp_file("not-a-data-url")
@@ -228,6 +269,8 @@ class TestSaveImageToTempFile:
         with patch("src.temp_file_handler.CURSOR_CLI_PROXY_TMP", str(tmp_path)):
             filepath = save_image_to_temp_file("data:image/png;base64,not-valid-base64!!!")
             assert filepath is None
+            # The partially written file is removed
+            assert os.listdir(tmp_path) == []
 
 
 # ============================================================================
@@ -311,6 +354,24 @@ class TestCommandBuilderFileProcessing:
             
             assert "What is this?" in result
 
+    def test_get_processed_content_without_file_processing(self, tmp_path):
+        """Test _get_processed_content keeps raw text and skips images when not processing files."""
+        with patch("src.temp_file_handler.CURSOR_CLI_PROXY_TMP", str(tmp_path)):
+            large_content = "x" * (CONTENT_SIZE_THRESHOLD + 100)
+            msg = Message(
+                role="user",
+                content=[
+                    {"type": "text", "text": large_content},
+                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{base64.b64encode(b'PNG').decode()}"}}
+                ]
+            )
+            
+            builder = CommandBuilder(model="auto", api_key="sk-test", messages=[msg])
+            result = builder._get_processed_content(msg, process_files=False)
+            
+            assert result == large_content
+            assert list(tmp_path.iterdir()) == []
+
 
 class TestCommandBuilderMergeMessages:
     """Test CommandBuilder._merge_messages with file content."""
@@ -1,3 +1,4 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock
 from src.model_registry import ModelRegistry, Model
@@ -96,3 +97,20 @@ class TestGetModelsDisplayIds:
         registry.get_models()
 
         assert registry._models[0].id == "opus-4.6"
+
+    def test_display_models_cached_until_models_replaced(self, registry):
+        registry._models = [Model(id="opus-4.6", owned_by="cursor")]
+        first = registry.get_models()
+        assert registry.get_models()[0] is first[0]
+
+        registry._models = [Model(id="sonnet-4.5", owned_by="cursor")]
+        assert [m.id for m in registry.get_models()] == ["claude-sonnet-4.5"]
+
+    def test_models_json_cached_until_models_replaced(self, registry):
+        registry._models = [Model(id="opus-4.6", owned_by="cursor")]
+        body = registry.get_models_json()
+        assert json.loads(body)["data"][0]["id"] == "claude-opus-4.6"
+        assert registry.get_models_json() is body
+
+        registry._models = [Model(id="auto", owned_by="cursor")]
+        assert json.loads(registry.get_models_json())["data"][0]["id"] == "auto"
@@ -38,3 +38,9 @@ def test_system_message_merge():
     assert prompt == "You are a helper.\n\nHi"
     assert "SYSTEM:" not in prompt
     assert "USER:" not in prompt
+
+async def test_async_build_matches_build():
+    messages = [Message(role="user", content="hello")]
+    builder = CommandBuilder(model="auto", api_key="sk-test", messages=messages, session_id="sid-1")
+    
+    assert await builder.async_build(stream=True) == builder.build(stream=True)
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
-from src.relay import Executor
+from src.relay import Executor, StreamStats
 
 @pytest.mark.asyncio
 async def test_run_stream():
@@ -23,7 +23,7 @@ async def test_run_stream():
         async for chunk in executor.run_stream(["cmd"]):
             chunks.append(chunk)
             
-        assert chunks == ["\n", "Hello", " World"]
+        assert chunks == ["Hello", " World"]
 
 @pytest.mark.asyncio
 async def test_run_stream_cumulative_partials():
@@ -46,7 +46,7 @@ async def test_run_stream_cumulative_partials():
         async for chunk in executor.run_stream(["cmd"]):
             chunks.append(chunk)
             
-        assert chunks == ["\n", "Hello", " World", "!"]
+        assert chunks == ["Hello", " World", "!"]
 
 @pytest.mark.asyncio
 async def test_run_stream_with_tool_and_assistant_output():
@@ -70,4 +70,48 @@ async def test_run_stream_with_tool_and_assistant_output():
             chunks.append(chunk)
         
         # Now includes tool call info along with assistant messages
-        assert chunks == ["\n", "\n", "📖 Tool #1: Reading README.md\n ", "\n", "Hello", "\n"]
+        assert chunks == ["📖 Tool #1: Reading README.md\n ", "\n", "Hello", "\n"]
+
+@pytest.mark.asyncio
+async def test_run_stream_non_json_line_passthrough():
+    executor = Executor()
+    
+    mock_process = AsyncMock()
+    mock_process.stdout = AsyncMock()
+    mock_process.stdout.__aiter__.return_value = [
+        b'  \n',
+        b'Error: not logged in\n',
+        b'{"type":"result","duration_ms":10}\n',
+    ]
+    mock_process.wait.return_value = 0
+    mock_process.returncode = 0
+    
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        chunks = []
+        async for chunk in executor.run_stream(["cmd"]):
+            chunks.append(chunk)
+        
+        # Blank lines are skipped; non-JSON lines are yielded as decoded text
+        assert chunks == ["Error: not logged in", "\n"]
+
+@pytest.mark.asyncio
+async def test_run_stream_counts_events_without_text():
+    executor = Executor()
+    
+    mock_process = AsyncMock()
+    mock_process.stdout = AsyncMock()
+    mock_process.stdout.__aiter__.return_value = [
+        b'{"type":"system","subtype":"init","model":"auto"}\n',
+        b'not json\n',
+        b'{"type":"result","duration_ms":10}\n',
+    ]
+    mock_process.wait.return_value = 0
+    mock_process.returncode = 0
+    
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        stats = StreamStats()
+        async for _ in executor.run_stream(["cmd"], stats=stats):
+            pass
+        
+        # Only lines that parsed as JSON events are counted
+        assert stats.events == 2
@@ -38,9 +38,6 @@ async def test_run_stream_mcp_tool_call_rejected():
         
         # Tool call events should now output formatted info, followed by assistant messages
         expected = [
-            "\n",
-            "\n",
-            "\n",
             "🔌 Tool #1: MCP bitbucket_R1-bitbucket_R1-get_pull_request\n ",
             "🔌 Tool #1: Rejected: MCP tool execution rejected by user: bitbucket_R1-get_pull_request \n ",
             "🔌 Tool #2: MCP bitbucket_R1-bitbucket_R1-get_diff\n ",
@@ -81,8 +78,6 @@ async def test_run_stream_read_write_tool_calls():
             chunks.append(chunk)
         
         expected = [
-            "\n",
-            "\n",
             "📖 Tool #1: Reading src/main.py\n ",
             "📖 Tool #1: Read 223 lines\n ",
             "🖊️ Tool #2: Creating test.txt\n ",
@@ -121,8 +116,6 @@ async def test_run_stream_tool_call_errors():
             chunks.append(chunk)
         
         expected = [
-            "\n",
-            "\n",
             "📖 Tool #1: Reading nonexistent.txt\n ",
             "📖 Tool #1: Error: File not found\n ",
             "🖊️ Tool #2: Creating /root/test.txt\n ",
@@ -164,8 +157,6 @@ async def test_run_stream_generic_tool_calls():
             chunks.append(chunk)
         
         expected = [
-            "\n",
-            "\n",
             '🔨 Tool #1: executeToolCall \n ',
             "🔨 Tool #1: Completed\n ",
             '🔨 Tool #2: analyzeToolCall \n ',
@@ -206,8 +197,6 @@ async def test_run_stream_arbitrary_tool_names():
             chunks.append(chunk)
         
         expected = [
-            "\n",
-            "\n",
             '🔨 Tool #1: someCustomTool \n ',
             "🔨 Tool #1: Completed\n ",
             '🔨 Tool #2: anotherTool \n ',
@@ -248,8 +237,6 @@ async def test_run_stream_interleaved_tool_calls():
             chunks.append(chunk)
         
         expected = [
-            "\n",
-            "\n",
             "📖 Tool #1: Reading file1.txt\n ",
             "📖 Tool #2: Reading file2.txt\n ",
             "📖 Tool #1: Read 100 lines\n ",  # Note: Tool #1 completes first
@@ -48,14 +48,64 @@ def test_calculate_history_hash_strips_think_block(session_manager):
 
     assert h1 == h2
 
+def test_calculate_history_hash_matches_canonical_list_dump(session_manager):
+    """Hashes must stay stable for sessions already stored in sessions.json."""
+    import hashlib
+    messages = [
+        {"role": "system", "content": "sys"},
+        Message(role="user", content=[{"type": "text", "text": "中文 \"quoted\""}]),
+        Message(role="assistant", content="<think>x</think>\n\nanswer"),
+    ]
+    canonical = [
+        {"role": "system", "content": "sys"},
+        {"role": "user", "content": [{"type": "text", "text": "中文 \"quoted\""}]},
+        {"role": "assistant", "content": "answer"},
+    ]
+    expected = hashlib.sha256(
+        json.dumps(canonical, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()
+
+    assert session_manager.calculate_history_hash(messages) == expected
+
+def test_history_hasher_extend_matches_full_hash(session_manager):
+    history = [Message(role="system", content="sys"), Message(role="user", content="hi")]
+    new_turn = [Message(role="user", content="next"), Message(role="assistant", content="<think>t</think>ok")]
+
+    hasher = session_manager.history_hasher(history)
+    extended = hasher.extend(new_turn)
+
+    assert hasher.hexdigest() == session_manager.calculate_history_hash(history)
+    assert extended.hexdigest() == session_manager.calculate_history_hash(history + new_turn)
+    assert session_manager.history_hasher([]).hexdigest() == session_manager.calculate_history_hash([])
+
+def test_canonical_cache_is_bounded_by_size(session_manager, monkeypatch):
+    """Cached canonical JSON never exceeds the character budget; oversized messages are not cached."""
+    from collections import OrderedDict
+    from src import session_manager as sm
+
+    monkeypatch.setattr(sm, "CANONICAL_CACHE_MAX_CHARS", 1000)
+    monkeypatch.setattr(sm, "_canonical_cache", OrderedDict())
+    monkeypatch.setattr(sm, "_canonical_cache_chars", 0)
+
+    messages = [Message(role="user", content=f"{i}" * 150) for i in range(10)]
+    expected = session_manager.calculate_history_hash([m.model_dump() for m in messages])
+    assert session_manager.calculate_history_hash(messages) == expected
+    assert 0 < sm._canonical_cache_chars <= 1000
+    assert sm._canonical_cache_chars == sum(len(c) + len(j) for (_, c), j in sm._canonical_cache.items())
+    # Most recent messages are kept
+    assert ("user", messages[-1].content) in sm._canonical_cache
+
+    session_manager.calculate_history_hash([Message(role="user", content="x" * 2000)])
+    assert ("user", "x" * 2000) not in sm._canonical_cache
+
 @patch("subprocess.Popen")
 def test_create_session(mock_subprocess, session_manager):
     mock_subprocess.return_value = make_popen_mock("test-uuid-1234")
     
     history_hash = "some_hash"
-    session_id = session_manager.create_session(history_hash, title="Test Chat")
+    session = session_manager.create_session(history_hash, title="Test Chat")
     
-    assert session_id == "test-uuid-1234"
+    assert session["session_id"] == "test-uuid-1234"
     
     # Verify storage
     data = session_manager.load_sessions()
@@ -67,6 +117,8 @@ def test_create_session(mock_subprocess, session_manager):
     
     # Verify directory name contains session_id
     assert s_data["workspace_dir"].endswith("test-uuid-1234")
+    # The returned record matches what was stored
+    assert session == s_data
     
     # Verify directory creation
     assert os.path.exists(s_data["workspace_dir"])
@@ -82,6 +134,15 @@ def test_create_session(mock_subprocess, session_manager):
     
     mock_subprocess.assert_called_once()
 
+@patch("subprocess.Popen")
+async def test_async_create_session(mock_subprocess, session_manager):
+    mock_subprocess.return_value = make_popen_mock("test-uuid-async")
+    
+    session = await session_manager.async_create_session("async_hash", title="Async Chat")
+    
+    assert session["session_id"] == "test-uuid-async"
+    assert session_manager.get_session_by_hash("async_hash") == session
+
 def test_update_session_hash(session_manager):
     h1 = "hash1"
     session_data = {"session_id": "sid-1", "title": "t1", "created_at": "now", "updated_at": "now"}
@@ -99,6 +160,23 @@ def test_update_session_hash(session_manager):
     assert s2["session_id"] == "sid-1"
     assert s2["updated_at"] != "now" # Should be updated timestamp (or at least different string if we mock time, but here checking key presence)
 
+async def test_async_update_session_hash(session_manager):
+    session_manager.save_session("hash1", {"session_id": "sid-1", "title": "t1", "created_at": "now", "updated_at": "now"})
+    
+    await session_manager.async_update_session_hash("hash1", "hash2")
+    
+    assert session_manager.get_session_by_hash("hash1") is None
+    assert session_manager.get_session_by_hash("hash2")["session_id"] == "sid-1"
+
+async def test_async_session_lookups(session_manager):
+    session_manager.save_session("hash1", {"session_id": "sid-1", "title": "t1", "created_at": "now", "updated_at": "now"})
+    
+    assert (await session_manager.async_get_session_by_hash("hash1"))["session_id"] == "sid-1"
+    assert (await session_manager.async_get_session_by_id("sid-1"))["title"] == "t1"
+    assert await session_manager.async_get_hash_by_session_id("sid-1") == "hash1"
+    assert await session_manager.async_get_session_by_hash("missing") is None
+    assert await session_manager.async_get_session_by_id("") is None
+
 def test_storage_failure(session_manager):
     # Simulate read-only filesystem or permission error
     with patch("builtins.open", side_effect=IOError("Permission denied")):
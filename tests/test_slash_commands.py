@@ -337,6 +337,23 @@ def test_get_command_labels_without_title(tmp_path):
     assert any("(command [project])" in label and "/plain" in label for label in labels)
 
 
+def test_get_command_labels_rereads_edited_title(tmp_path):
+    """Cached titles should be refreshed when the file is modified."""
+    commands_dir = tmp_path / ".cursor" / "commands"
+    commands_dir.mkdir(parents=True)
+    command_file = commands_dir / "review.md"
+    command_file.write_text("# Old Title\n")
+
+    loader = SlashCommandLoader(workspace_dir=str(tmp_path))
+    assert any("Old Title" in label for label in loader.get_command_labels())
+
+    command_file.write_text("# New Title\n")
+    stat = command_file.stat()
+    os.utime(command_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert any("New Title" in label for label in loader.get_command_labels())
+
+
 # ============================================================
 # CommandBuilder integration
 # ============================================================
@@ -392,6 +409,91 @@ def test_command_builder_only_resolves_user_messages(tmp_path):
     assert "/test should not resolve" in prompt
 
 
+def test_command_builder_reuses_slash_loader_per_workspace(tmp_path):
+    """Builders for the same workspace share one loader while its directories are unchanged."""
+    commands_dir = tmp_path / ".cursor" / "commands"
+    commands_dir.mkdir(parents=True)
+    (commands_dir / "hello.md").write_text("Hello")
+
+    messages = [Message(role="user", content="/hello")]
+    first = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+    second = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+
+    assert first.slash_loader is second.slash_loader
+
+
+def test_command_builder_reloads_slash_loader_when_command_written_in_place(tmp_path):
+    """A command file created empty and filled in later is picked up although the directory is unchanged."""
+    commands_dir = tmp_path / ".cursor" / "commands"
+    commands_dir.mkdir(parents=True)
+    deploy = commands_dir / "deploy.md"
+    deploy.write_text("")
+
+    messages = [Message(role="user", content="/deploy now")]
+    first = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+    assert "deploy" not in first.slash_loader.entries
+
+    dir_mtime_ns = commands_dir.stat().st_mtime_ns
+    deploy.write_text("---\ndescription: Ship it\n---\n# Deploy")
+    os.utime(commands_dir, ns=(dir_mtime_ns, dir_mtime_ns))
+    second = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+
+    assert f"@{deploy}" in second.build()[-1]
+    assert second.slash_loader.entries["deploy"]["description"] == "Ship it"
+
+
+def test_command_builder_scans_slash_commands_on_build_not_construction(tmp_path, monkeypatch):
+    """The directory scan runs inside build, which async_build moves off the event loop."""
+    calls = []
+    original = SlashCommandLoader.scan_signature.__func__
+    monkeypatch.setattr(SlashCommandLoader, "scan_signature", classmethod(lambda cls, ws=None: calls.append(ws) or original(cls, ws)))
+
+    builder = CommandBuilder(model="auto", api_key="sk-test", messages=[Message(role="user", content="hi")], workspace_dir=str(tmp_path))
+    assert calls == []
+    builder.build()
+    assert calls == [str(tmp_path)]
+
+
+def test_command_builder_slash_loader_cache_is_bounded(tmp_path, monkeypatch):
+    """Only the most recently used workspaces keep a cached loader."""
+    monkeypatch.setattr("src.command_builder.SLASH_LOADER_CACHE_SIZE", 2)
+    messages = [Message(role="user", content="hi")]
+    workspaces = []
+    for name in ("a", "b", "c"):
+        workspace = tmp_path / name
+        workspace.mkdir()
+        workspaces.append(str(workspace))
+
+    first = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=workspaces[0]).slash_loader
+    CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=workspaces[1]).slash_loader
+    # Using the first workspace again makes the second one the least recently used
+    assert CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=workspaces[0]).slash_loader is first
+    CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=workspaces[2]).slash_loader
+
+    cached_workspaces = [key[0] for key in CommandBuilder._slash_loader_cache]
+    assert cached_workspaces == [workspaces[0], workspaces[2]]
+
+
+def test_command_builder_reloads_slash_loader_when_commands_added(tmp_path):
+    """A new command file invalidates the cached loader for that workspace."""
+    commands_dir = tmp_path / ".cursor" / "commands"
+    commands_dir.mkdir(parents=True)
+    (commands_dir / "hello.md").write_text("Hello")
+
+    messages = [Message(role="user", content="/later")]
+    first = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+    assert "later" not in first.slash_loader.entries
+
+    (commands_dir / "later.md").write_text("Added later")
+    # Make sure the directory mtime moves even on filesystems with coarse timestamps
+    mtime_ns = commands_dir.stat().st_mtime_ns + 1_000_000_000
+    os.utime(commands_dir, ns=(mtime_ns, mtime_ns))
+    second = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+
+    assert second.slash_loader is not first.slash_loader
+    assert "later" in second.slash_loader.entries
+
+
 # ============================================================
 # Edge cases
 # ============================================================
@@ -1324,3 +1426,31 @@ def test_xml_includes_source_for_non_plugin(tmp_path):
     global_block = _re.search(r"<command>.*?<name>global-cmd</name>.*?</command>", xml, _re.DOTALL)
     assert global_block is not None
     assert "<source>user</source>" in global_block.group(0)
+
+
+def test_command_builder_reloads_slash_loader_when_nested_plugin_installed(tmp_path):
+    """A plugin installed into an existing plugins/cache/ subfolder invalidates the cached loader."""
+    home = tmp_path / "home"
+    vendor_dir = home / ".cursor" / "plugins" / "cache" / "acme"
+    _create_plugin(
+        vendor_dir / "first" / "abc123",
+        manifest={"name": "first"},
+        skills={"brainstorming": "# Brainstorming"},
+    )
+
+    messages = [Message(role="user", content="/deploy")]
+    first = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+    assert "deploy" not in first.slash_loader.entries
+
+    _create_plugin(
+        vendor_dir / "second" / "def456",
+        manifest={"name": "second"},
+        commands={"deploy.md": "# Deploy"},
+    )
+    # Make sure the vendor directory mtime moves even on filesystems with coarse timestamps
+    mtime_ns = vendor_dir.stat().st_mtime_ns + 1_000_000_000
+    os.utime(vendor_dir, ns=(mtime_ns, mtime_ns))
+    second = CommandBuilder(model="auto", api_key="sk-test", messages=messages, workspace_dir=str(tmp_path))
+
+    assert second.slash_loader is not first.slash_loader
+    assert "deploy" in second.slash_loader.entries
@@ -0,0 +1,76 @@
+"""Tests for coalescing stream chunks into larger frames."""
+import asyncio
+import pytest
+
+from src.stream_buffer import coalesce_chunks, with_keepalive
+
+
+async def collect(agen):
+    return [item async for item in agen]
+
+
+async def from_list(items):
+    for item in items:
+        yield item
+
+
+async def gated(first, second, release):
+    """Yield first, then wait for release before yielding second."""
+    yield first
+    await release.wait()
+    yield second
+
+
+async def test_merges_chunks_that_arrive_together():
+    result = await collect(coalesce_chunks(from_list(["a", "b", "c"])))
+    assert result == ["abc"]
+
+
+async def test_flushes_when_size_reached():
+    result = await collect(coalesce_chunks(from_list(["ab", "cd", "e"]), flush_size=4, flush_interval=10))
+    assert result == ["abcd", "e"]
+
+
+async def test_flushes_after_interval():
+    release = asyncio.Event()
+    result = []
+    # "b" is only produced once "a" has been received, so "a" must be flushed by the timer
+    async for chunk in coalesce_chunks(gated("a", "b", release), flush_interval=0.01):
+        result.append(chunk)
+        release.set()
+    assert result == ["a", "b"]
+
+
+async def test_empty_source_yields_nothing():
+    assert await collect(coalesce_chunks(from_list([]))) == []
+
+
+async def test_error_raised_after_buffered_text():
+    async def failing():
+        yield "partial"
+        raise RuntimeError("boom")
+
+    received = []
+    with pytest.raises(RuntimeError, match="boom"):
+        async for chunk in coalesce_chunks(failing()):
+            received.append(chunk)
+    assert received == ["partial"]
+
+
+async def test_keepalive_passes_frames_through():
+    result = await collect(with_keepalive(from_list([b"a", b"b"]), interval=10))
+    assert result == [b"a", b"b"]
+
+
+async def test_keepalive_sent_while_source_is_idle():
+    release = asyncio.Event()
+    result = []
+    # The source stays idle after "a" until a keepalive has been received
+    async for frame in with_keepalive(gated(b"a", b"b", release), interval=0.01, keepalive=b":\n\n"):
+        result.append(frame)
+        if frame == b":\n\n":
+            release.set()
+    assert result[0] == b"a"
+    assert result[-1] == b"b"
+    assert b":\n\n" in result
+    assert [frame for frame in result if frame != b":\n\n"] == [b"a", b"b"]
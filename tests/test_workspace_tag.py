@@ -131,7 +131,15 @@ class TestExtractWorkspaceFromMessages:
         assert workspace is None
         assert session_id is None
         assert messages == []
-    
+
+    def test_extract_without_system_message_returns_messages_unchanged(self):
+        messages = [Message(role="user", content="<workspace>/home/user/project</workspace> Hello")]
+        workspace, session_id, cleaned = extract_workspace_from_messages(messages)
+
+        assert workspace is None
+        assert session_id is None
+        assert cleaned is messages
+
     def test_extract_no_workspace_tag(self):
         messages = [
             Message(role="system", content="You are a helpful assistant"),
@@ -146,6 +154,8 @@ class TestExtractWorkspaceFromMessages:
         assert session_id is None
         assert len(cleaned) == 2
         assert cleaned[0].content == "You are a helpful assistant"
+        # Untagged system message is passed through without being rebuilt
+        assert cleaned[0] is messages[0]
     
     def test_extract_workspace_from_system_message(self):
         messages = [
@@ -162,6 +172,22 @@ class TestExtractWorkspaceFromMessages:
         assert "<workspace>" not in cleaned[0].content
         assert "You are helpful" in cleaned[0].content
     
+    def test_extract_workspace_and_session_id_from_one_system_message(self):
+        messages = [
+            Message(role="system", content="<session_id>sid-1</session_id>\nYou are helpful\n<workspace>/home/user/project</workspace>"),
+            Message(role="system", content="<workspace>/home/user/other</workspace> Second"),
+        ]
+        with patch.dict(os.environ, {"WORKSPACE_WHITELIST_1": "/home/user"}, clear=False):
+            settings = build_settings()
+            with patch("src.tag_parser.config", settings):
+                workspace, session_id, cleaned = extract_workspace_from_messages(messages)
+        
+        assert workspace == "/home/user/project"
+        assert session_id == "sid-1"
+        assert cleaned[0].content == "You are helpful"
+        # Tags already found earlier are left in later system messages
+        assert cleaned[1] is messages[1]
+    
     def test_extract_ignores_user_message_workspace(self):
         """Workspace tag in user message should be ignored"""
         messages = [
@@ -249,6 +275,13 @@ class TestConfigWorkspaceWhitelist:
             settings = build_settings()
             assert settings.get_workspace_whitelist() == ["/path1", "/path2"]
 
+    def test_whitelist_normalized_is_cached(self):
+        with patch.dict(os.environ, {"WORKSPACE_WHITELIST_1": "/path1/", "WORKSPACE_WHITELIST_2": "/a/../path2"}, clear=False):
+            settings = build_settings()
+            normalized = settings.get_workspace_whitelist_normalized()
+            assert normalized == (("/path1", "/path1" + os.sep), ("/path2", "/path2" + os.sep))
+            assert settings.get_workspace_whitelist_normalized() is normalized
+
 
 class TestSessionManagerCustomWorkspace:
     """Tests for SessionManager with custom workspace"""
@@ -265,13 +298,13 @@ class TestSessionManagerCustomWorkspace:
         
         custom_ws = tmp_path / "custom_workspace"
         history_hash = "custom_hash"
-        session_id = session_manager.create_session(
+        session = session_manager.create_session(
             history_hash, 
             title="Custom WS Session",
             custom_workspace=str(custom_ws)
         )
         
-        assert session_id == "test-uuid-custom"
+        assert session["session_id"] == "test-uuid-custom"
         
         # Verify storage
         data = session_manager.load_sessions()
@@ -295,12 +328,12 @@ class TestSessionManagerCustomWorkspace:
         mock_subprocess.return_value = make_popen_mock("test-uuid-default")
         
         history_hash = "default_hash"
-        session_id = session_manager.create_session(
+        session = session_manager.create_session(
             history_hash, 
             title="Default WS Session"
         )
         
-        assert session_id == "test-uuid-default"
+        assert session["session_id"] == "test-uuid-default"
         
         # Verify storage
         data = session_manager.load_sessions()